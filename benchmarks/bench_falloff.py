@@ -0,0 +1,57 @@
+"""
+
+    Weights per second for the falloff kernels, one sample at a time against the batched path.
+
+    Run with `python benchmarks/bench_falloff.py [count]`.
+
+"""
+
+import os
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lxserv", "item_type"))
+
+import falloff_kernel  # noqa: E402
+
+
+# Scaled by two and moved, so about half of the samples land inside the box
+WORLD_INVERSE = ((0.5, 0.0, 0.0, 0.0), (0.0, 0.5, 0.0, 0.0), (0.0, 0.0, 0.5, 0.0), (-0.25, 0.0, 0.1, 1.0))
+
+
+def scalar(positions, kernel):
+    """ What a per sample weight_local call does, transform one position and weight it. """
+    (a, b, c, _), (d, e, f, _), (g, h, i, _), (tx, ty, tz, _) = kernel.rows
+    weights = array("d")
+    for index in range(0, len(positions), 3):
+        x, y, z = positions[index:index + 3]
+        local = (x * a + y * d + z * g + tx, x * b + y * e + z * h + ty, x * c + y * f + z * i + tz)
+        weights.append(kernel.weight_local(local))
+    return weights
+
+
+def run(name, function, count):
+    start = time.perf_counter()
+    weights = function()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10} {count / elapsed / 1e6:8.2f} M weights/s  (sum {sum(weights):.1f})")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    rng = random.Random(0)
+    positions = array("d", (rng.uniform(-2.0, 2.0) for _ in range(count * 3)))
+
+    curves = {falloff_kernel.CONSTANT: "constant", falloff_kernel.LINEAR: "linear", falloff_kernel.SMOOTH: "smooth"}
+    for shape in falloff_kernel.SHAPES:
+        for curve, curve_name in curves.items():
+            print(f"{shape} {curve_name}")
+            kernel = falloff_kernel.Kernel(shape, curve, WORLD_INVERSE)
+            run("scalar", lambda: scalar(positions, kernel), count)
+            run("batched", lambda: kernel.weights(positions), count)
+
+
+if __name__ == "__main__":
+    main()
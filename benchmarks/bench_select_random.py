@@ -0,0 +1,108 @@
+"""
+
+    Per-test cost of py.selops.random on a stand-in mesh.
+
+    Modo isn't needed, the stand-in mesh hands out accessors that map element IDs to indices the same way the real
+    ones are used by the selection operation. Run with `python benchmarks/bench_select_random.py [count]`.
+
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lxserv", "mesh_operations"))
+
+import sampling  # noqa: E402
+
+
+class StandInAccessor(object):
+    """ Mimics a point/edge/polygon accessor, Select takes an element ID and Index returns its index. """
+    def __init__(self, ids):
+        self.ids = ids
+        self.current = 0
+
+    def set(self, accessor):
+        self.ids = accessor.ids
+        return True
+
+    def Select(self, element):
+        self.current = element
+
+    def Index(self):
+        return self.ids[self.current]
+
+
+class StandInMesh(object):
+    def __init__(self, count: int):
+        # element IDs are pointers in Modo, use large unordered ints to keep the lookup honest
+        self.element_ids = random.Random(0).sample(range(1 << 40), count)
+        self.ids = {element: index for index, element in enumerate(self.element_ids)}
+
+    def PointCount(self):
+        return len(self.element_ids)
+
+    def PointAccessor(self):
+        return StandInAccessor(self.ids)
+
+
+def rebind_per_test(mesh, bits):
+    """ The original path, fetching and binding an accessor for every tested element. """
+    point = StandInAccessor(None)
+
+    def test(element):
+        point.set(mesh.PointAccessor())
+        point.Select(element)
+        return point.Index() in bits
+    return test
+
+
+def bound_once(mesh, bits):
+    point = mesh.PointAccessor()
+
+    def test(element):
+        point.Select(element)
+        return point.Index() in bits
+    return test
+
+
+def bound_once_hashed(mesh, seed, threshold):
+    point = mesh.PointAccessor()
+
+    def test(element):
+        point.Select(element)
+        return sampling.hash_test(seed, point.Index(), threshold)
+    return test
+
+
+def constant(value):
+    def test(element):
+        return value
+    return test
+
+
+def run(name, test, elements):
+    start = time.perf_counter()
+    selected = sum(1 for element in elements if test(element))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {elapsed * 1e9 / len(elements):8.1f} ns/test  ({selected} selected)")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    mesh = StandInMesh(count)
+    elements = mesh.element_ids
+
+    start = time.perf_counter()
+    bits = sampling.sample_bits(count, 0.5, random.Random(0))
+    print(f"sample_bits setup         {(time.perf_counter() - start) * 1e3:8.1f} ms for {count} points")
+
+    run("rebind per test", rebind_per_test(mesh, bits), elements)
+    run("bound once", bound_once(mesh, bits), elements)
+    run("bound once, stateless", bound_once_hashed(mesh, 0, sampling.hash_threshold(0.5)), elements)
+    run("constant (0% / 100%)", constant(True), elements)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,3 +8,5 @@ from . import command_arg
 from . import mesh
 from . import vertmap_hints
 from . import item_hints
+from . import item_picker
+from . import vertmap_catalog
@@ -5,17 +5,75 @@
 """
 
 from __future__ import annotations
-from typing import Tuple
+from math import ceil, sqrt
+from typing import Dict, List, Tuple
 
 import lx
 import lxu.command
 
+from .schematic_index import schematic_index
+
+
+ALIGN_Y, ALIGN_X, DISTRIBUTE_X, DISTRIBUTE_Y, GRID = 0, 1, 2, 3, 4
+
+EPSILON = 1e-6  # nodes closer than this to their target are left alone
+
+
+def plan(positions: List[Tuple[float, float]], reference: Tuple[float, float], mode: int,
+         spacing: float) -> List[Tuple[float, float]]:
+    """ Given the current node positions and the position of the reference node, return the target position for each
+    node. Nothing is written here so the targets can be compared against the current positions first. """
+    if mode == ALIGN_Y:
+        return [(x, reference[1]) for x, _ in positions]
+
+    if mode == ALIGN_X:
+        return [(reference[0], y) for _, y in positions]
+
+    targets = list(positions)
+    if mode in (DISTRIBUTE_X, DISTRIBUTE_Y):
+        # evenly space the nodes between the two outermost, keeping their order along the axis
+        axis = 0 if mode == DISTRIBUTE_X else 1
+        order = sorted(range(len(positions)), key=lambda i: positions[i][axis])
+        if len(order) < 3:
+            return targets
+
+        low, high = positions[order[0]][axis], positions[order[-1]][axis]
+        step = (high - low) / (len(order) - 1)
+        for rank, index in enumerate(order):
+            target = list(positions[index])
+            target[axis] = low + rank * step
+            targets[index] = tuple(target)
+        return targets
+
+    if mode == GRID:
+        # pack into a square-ish grid from the top left node, in reading order of where they sit now
+        columns = max(1, int(ceil(sqrt(len(positions)))))
+        left = min(x for x, _ in positions)
+        top = min(y for _, y in positions)
+        order = sorted(range(len(positions)), key=lambda i: (positions[i][1], positions[i][0]))
+        for rank, index in enumerate(order):
+            row, column = divmod(rank, columns)
+            targets[index] = (left + column * spacing, top + row * spacing)
+        return targets
+
+    return targets
+
 
 class Command(lxu.command.BasicCommand):
-    """ Implements a command which will align the y position of all nodes in a workspace to that of the currently
-    selected item. """
+    """ Implements a command which will align or distribute the nodes of the selected items in the schematic. With a
+    single item selected it will, like the SDK sample, align the y position of all nodes in its workspace to it. """
     def __init__(self):
         lxu.command.BasicCommand.__init__(self)
+        self.dyna_Add("mode", lx.symbol.sTYPE_INTEGER)
+        self.dyna_SetHint(0, ((ALIGN_Y, "alignY"), (ALIGN_X, "alignX"), (DISTRIBUTE_X, "distributeX"),
+                              (DISTRIBUTE_Y, "distributeY"), (GRID, "grid")))
+        self.dyna_Add("spacing", lx.symbol.sTYPE_FLOAT)
+        self.basic_SetFlags(0, lx.symbol.fCMDARG_OPTIONAL)
+        self.basic_SetFlags(1, lx.symbol.fCMDARG_OPTIONAL)
+
+    def cmd_DialogInit(self):
+        if not self.dyna_IsSet(1):
+            self.attr_SetFlt(1, 100.0)
 
     @staticmethod
     def get_selected_item() -> lx.object.Item:
@@ -27,31 +85,47 @@ class Command(lxu.command.BasicCommand):
         packet = selection_service.Recent(lx.symbol.iSEL_ITEM)
         return item_translation_packet.Item(packet)
 
+    @staticmethod
+    def get_selected_items() -> List[lx.object.Item]:
+        """ Get all selected items in selection order """
+        selection_service = lx.service.Selection()
+        item_translation_packet = lx.object.ItemPacketTranslation(
+            selection_service.Allocate(lx.symbol.sSELTYP_ITEM)
+        )
+        count = selection_service.Count(lx.symbol.iSEL_ITEM)
+        return [item_translation_packet.Item(selection_service.ByIndex(lx.symbol.iSEL_ITEM, index))
+                for index in range(count)]
+
+    def get_nodes(self, item: lx.object.Item) -> Dict[str, lx.object.SchematicNode]:
+        """ Get the nodes to arrange keyed on item ident. For several selected items these are the nodes of the
+        selected items found in any workspace, for a single item every node in its workspace. Raises LookupError if
+        the most recently selected item has no node. """
+        group, node = self.get_schematic_group(item)
+        nodes = {item.Ident(): node}
+
+        selected = self.get_selected_items()
+        if len(selected) > 1:
+            for item_ in selected:
+                try:
+                    nodes[item_.Ident()] = self.get_schematic_group(item_)[1]
+                except LookupError:  # not every selected item has to be in a schematic
+                    continue
+            return nodes
+
+        for node_index in range(group.NodeCount()):
+            node_ = group.NodeByIndex(node_index)  # type: lx.object.SchematicNode
+            nodes[node_.Item().Ident()] = node_
+        return nodes
+
     @staticmethod
     def get_schematic_group(item: lx.object.Item) -> Tuple[lx.object.SchematicGroup, lx.object.SchematicNode]:
-        """ Given an item, search all group items in scene testing against schematic group interface then attempting
-        to find the node for the item.
+        """ Given an item, find the schematic group and node for it through the shared schematic index, which only
+        walks the group items in the scene when they might have changed since the last lookup.
 
         Return group and node for the item or raise LookupError
 
         """
-        schematic_group = lx.object.SchematicGroup()
-        scene = item.Context()  # type: lx.object.Scene
-        group_type = lx.service.Scene().ItemTypeLookup(lx.symbol.sITYPE_GROUP)  # type: int
-        group_count = scene.ItemCount(group_type)  # type: int
-        for group_index in range(group_count):
-            group_item = scene.ItemByIndex(group_type, group_index)  # type: lx.object.Item
-            if not schematic_group.set(group_item):  # see if the item has the interface for schematic group or skip
-                continue
-
-            node_count = schematic_group.NodeCount()  # type: int
-            for node_index in range(node_count):
-                schematic_node = schematic_group.NodeByIndex(node_index)  # type: lx.object.SchematicNode
-                item_ = schematic_node.Item()  # type: lx.object.Item
-                if item_.Ident() == item.Ident():  # if we've found the node for the input item, return group and node
-                    return schematic_group, schematic_node
-
-        raise LookupError("Failed to find schematic group and node")
+        return schematic_index.lookup(item)
 
     def cmd_Flags(self):
         return lx.symbol.fCMD_SELECT | lx.symbol.fCMD_UNDO
@@ -59,7 +133,8 @@ class Command(lxu.command.BasicCommand):
     def basic_Execute(self, message: lxu.object.Message, flags: int):  # pylint: disable=invalid-name, unused-argument
         """ Overridden method,
 
-        Using our utility methods, align nodes along y-coordinates in same schematic as the selected item
+        Using our utility methods, arrange the nodes of the selected items, or for a single selected item all nodes in
+        the same schematic, according to mode
 
         """
         try:
@@ -71,20 +146,24 @@ class Command(lxu.command.BasicCommand):
             return
 
         try:
-            group, node = self.get_schematic_group(item)  # Find a schematic group item where item is present,
+            nodes = self.get_nodes(item)  # Find the nodes to move, through the schematic group the item is in,
         except LookupError as exception:
             message.SetCode(lx.result.FAILED)
             message.SetMessage('common', '', 99)
             message.SetArgumentString(1, str(exception))
             return
 
-        _, y = node.Position()  # Get the y position for the selected item's node,
-
-        # For each other node in that schematic group, set their y position to match
-        for node_index in range(group.NodeCount()):
-            node_ = group.NodeByIndex(node_index)  # type: lx.object.SchematicNode
-            x, _ = node_.Position()
-            node_.SetPosition(x, y)
+        mode = self.dyna_Int(0, ALIGN_Y)
+        spacing = self.dyna_Float(1, 100.0)
+
+        # Compute every target first, then only write the nodes that actually move. The command is flagged for undo
+        # so all the writes end up in the same undo step.
+        keys = list(nodes)
+        positions = [tuple(nodes[key].Position()) for key in keys]
+        reference = tuple(nodes[item.Ident()].Position())
+        for key, current, target in zip(keys, positions, plan(positions, reference, mode, spacing)):
+            if abs(current[0] - target[0]) > EPSILON or abs(current[1] - target[1]) > EPSILON:
+                nodes[key].SetPosition(*target)
 
 
 lx.bless(Command, "py.align.schematic")
@@ -0,0 +1,129 @@
+"""
+
+    Bounding box helpers for the py.mesh command.
+
+    Positions are gathered into flat arrays of doubles (x, y, z, x, y, z, ...) and reduced a chunk at a time, so the
+    min/max work happens inside the builtins rather than in a Python call per point. Only one chunk is buffered at a
+    time, memory stays the same no matter how dense the meshes are.
+
+    There is deliberately no thread pool for the reduction, min and max over arrays hold the GIL so worker threads
+    only add overhead under Modo's Python.
+
+"""
+
+from __future__ import annotations
+from array import array
+from typing import Callable, Iterable, Tuple
+
+
+CHUNK_SIZE = 8192  # number of points buffered before they get reduced into the box
+
+
+class BoundingBox(object):
+    """ Bounding Box object, holding two points min & max to define the axis aligned bounds. """
+    def __init__(self,
+                 min_=(float("inf"), float("inf"), float("inf")),
+                 max_=(-float("inf"), -float("inf"), -float("inf"))):
+        self.min = min_
+        self.max = max_
+
+    @property
+    def empty(self) -> bool:
+        return self.min[0] > self.max[0]
+
+    @property
+    def extent(self) -> Tuple[float, float, float]:
+        return tuple(b - a for a, b in zip(self.min, self.max))
+
+    @property
+    def center(self) -> Tuple[float, float, float]:
+        return tuple((a + b) * 0.5 for a, b in zip(self.min, self.max))
+
+    def add(self, point: Tuple[float, float, float]):
+        """ Add a point to the bounding box, expanding it """
+        self.min = tuple(min(a, b) for a, b in zip(self.min, point))
+        self.max = tuple(max(a, b) for a, b in zip(self.max, point))
+
+    def add_positions(self, positions):
+        """ Expand the box by a flat sequence of x, y, z values, reducing each axis with a single min and max. """
+        if not len(positions):
+            return
+
+        axes = [positions[axis::3] for axis in range(3)]
+        self.min = tuple(min(a, min(values)) for a, values in zip(self.min, axes))
+        self.max = tuple(max(b, max(values)) for b, values in zip(self.max, axes))
+
+    def merge(self, other: BoundingBox):
+        """ Expand this box to also hold another box. """
+        if not other.empty:
+            self.add(other.min)
+            self.add(other.max)
+
+    @classmethod
+    def combined(cls, boxes: Iterable[BoundingBox]) -> BoundingBox:
+        box = cls()
+        for other in boxes:
+            box.merge(other)
+        return box
+
+
+class Accumulator(object):
+    """ Collects positions into a buffer and reduces them into a bounding box once CHUNK_SIZE points are buffered. """
+    def __init__(self, chunk_size: int = CHUNK_SIZE):
+        self.bound = BoundingBox()
+        self.buffer = array("d")
+        self.limit = chunk_size * 3
+        self.count = 0
+
+    def add(self, point: Tuple[float, float, float]):
+        self.buffer.extend(point)
+        if len(self.buffer) >= self.limit:
+            self.flush()
+
+    def flush(self):
+        self.count += len(self.buffer) // 3
+        self.bound.add_positions(self.buffer)
+        self.buffer = array("d")
+
+    def result(self) -> BoundingBox:
+        """ Reduce whatever is left in the buffer and return the bounding box. """
+        self.flush()
+        return self.bound
+
+
+class BoundsCache(object):
+    """ Bounding boxes per mesh item ident, each stored with the change stamp it was computed at. A lookup with any
+    other stamp is a miss, so invalidating is up to whoever produces the stamps. """
+    def __init__(self):
+        self.boxes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, ident: str, stamp) -> BoundingBox:
+        entry = self.boxes.get(ident)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        return None
+
+    def put(self, ident: str, stamp, box: BoundingBox):
+        self.boxes[ident] = (stamp, box)
+
+    def prune(self, is_current: Callable[[str, tuple], bool]):
+        """ Drop every box is_current(ident, stamp) rejects, such as boxes for removed meshes. """
+        self.boxes = {ident: entry for ident, entry in self.boxes.items() if is_current(ident, entry[0])}
+
+    def stats(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, {len(self.boxes)} meshes cached"
+
+
+def format_box(box: BoundingBox) -> str:
+    if box.empty:
+        return "empty"
+
+    def vec(values):
+        return "({:.4f}, {:.4f}, {:.4f})".format(*values)
+
+    return f"min {vec(box.min)} max {vec(box.max)} extent {vec(box.extent)} center {vec(box.center)}"
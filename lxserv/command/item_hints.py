@@ -2,32 +2,69 @@
 
     Example of how to use the UI Value Hints to create a drop down menu where users can select available mesh items.
 
+    By default Modo asks the hints about every item in the scene, with prefilter set the hints instead list only the
+    meshes themselves, found through the scene's per type item enumeration.
+
 """
 
 import lx
 import lxifc
 import lxu.command
+import lxu.select
+
+
+mesh_type = None  # item type code for meshes, looked up on first use
+
+
+def get_mesh_type() -> int:
+    global mesh_type
+    if mesh_type is None:
+        mesh_type = lx.service.Scene().ItemTypeLookup(lx.symbol.sITYPE_MESH)
+    return mesh_type
 
 
 class Hints(lxifc.UIValueHints):
+    def __init__(self, prefilter: bool = False):
+        self.prefilter = prefilter
+        self.type = get_mesh_type()
+
+        # When prefiltering, list (ident, name) for every mesh up front, the first entry being "(none)"
+        self.items = [("", "(none)")]
+        if prefilter:
+            scene = lxu.select.SceneSelection().current()
+            for index in range(scene.ItemCount(self.type)):
+                item = scene.ItemByIndex(self.type, index)
+                self.items.append((item.Ident(), item.UniqueName()))
+
     def uiv_Flags(self) -> int:
+        if self.prefilter:
+            return lx.symbol.fVALHINT_POPUPS
         return lx.symbol.fVALHINT_ITEMS | lx.symbol.fVALHINT_ITEMS_NONE
 
     def uiv_ItemTest(self, item: lx.object.Unknown) -> bool:
         item_ = lx.object.Item(item)
-        scene_service = lx.service.Scene()
-        mesh_type = scene_service.ItemTypeLookup(lx.symbol.sITYPE_MESH)
-        return item_.TestType(mesh_type)
+        return item_.TestType(self.type)
+
+    def uiv_PopCount(self) -> int:
+        return len(self.items)
+
+    def uiv_PopUserName(self, index: int) -> str:
+        return self.items[index][1]
+
+    def uiv_PopInternalName(self, index: int) -> str:
+        return self.items[index][0]
 
 
 class Command(lxu.command.BasicCommand):
     def __init__(self):
         lxu.command.BasicCommand.__init__(self)
         self.dyna_Add("item", "&item")
+        self.dyna_Add("prefilter", lx.symbol.sTYPE_BOOLEAN)
+        self.basic_SetFlags(1, lx.symbol.fCMDARG_OPTIONAL)
 
     def arg_UIValueHints(self, index):
         if index == 0:
-            return Hints()
+            return Hints(bool(self.dyna_Int(1, 0)))
 
     def cmd_DialogInit(self):
         if not self.dyna_IsSet(0):
@@ -39,4 +76,3 @@ class Command(lxu.command.BasicCommand):
 
 
 lx.bless(Command, "py.item.hints")
-
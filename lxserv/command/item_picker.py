@@ -0,0 +1,165 @@
+"""
+
+    Searchable and paged mesh picker, for scenes with far too many meshes for the flat list in py.item.hints.
+
+    Mesh names are kept in an index sorted by lower case name, built once and then kept up to date from item add,
+    remove and rename events, so searching never has to walk the scene.
+
+"""
+
+from bisect import bisect_left, insort
+from typing import List, Tuple
+
+import lx
+import lxifc
+import lxu.command
+import lxu.select
+
+from pysample_common.listener import Listener
+
+from .item_hints import get_mesh_type
+
+
+SERVER_NAME = "py.item.picker"
+
+MATCH_PREFIX, MATCH_SUBSTRING = 0, 1
+
+
+class NameIndex(Listener, lxifc.SceneItemListener, lxifc.SelectionListener):
+    def __init__(self):
+        self.names = {}  # item ident -> (lower case name, name)
+        self.sorted = []  # (lower case name, ident) sorted for prefix searches
+        self.built = False
+        Listener.__init__(self)
+
+    def build(self):
+        self.names = {}
+        self.sorted = []
+        mesh_type = get_mesh_type()
+        scene = lxu.select.SceneSelection().current()
+        for index in range(scene.ItemCount(mesh_type)):
+            item = scene.ItemByIndex(mesh_type, index)
+            name = item.UniqueName()
+            self.names[item.Ident()] = (name.lower(), name)
+
+        self.sorted = sorted((lower, ident) for ident, (lower, _) in self.names.items())
+        self.built = True
+
+    def add(self, item: lx.object.Item):
+        ident = item.Ident()
+        self.remove(ident)
+        name = item.UniqueName()
+        self.names[ident] = (name.lower(), name)
+        insort(self.sorted, (name.lower(), ident))
+
+    def remove(self, ident: str):
+        entry = self.names.pop(ident, None)
+        if entry is not None:
+            index = bisect_left(self.sorted, (entry[0], ident))
+            if index < len(self.sorted) and self.sorted[index] == (entry[0], ident):
+                del self.sorted[index]
+
+    def search(self, text: str, match: int = MATCH_PREFIX) -> List[Tuple[str, str]]:
+        """ Return (ident, name) of all meshes whose name starts with, or contains, text ignoring case. """
+        if not self.built:
+            self.build()
+
+        text = text.lower()
+        if match == MATCH_SUBSTRING:
+            return [(ident, self.names[ident][1]) for lower, ident in self.sorted if text in lower]
+
+        matches = []
+        for index in range(bisect_left(self.sorted, (text,)), len(self.sorted)):
+            lower, ident = self.sorted[index]
+            if not lower.startswith(text):
+                break
+            matches.append((ident, self.names[ident][1]))
+        return matches
+
+    def sil_ItemAdd(self, item):
+        item = lx.object.Item(item)
+        if self.built and item.TestType(get_mesh_type()):
+            self.add(item)
+
+    def sil_ItemRemove(self, item):
+        if self.built:
+            self.remove(lx.object.Item(item).Ident())
+
+    def sil_ItemName(self, item):
+        item = lx.object.Item(item)
+        if self.built and item.Ident() in self.names:
+            self.add(item)
+
+    def sil_SceneClear(self, scene):
+        self.built = False
+
+    def selevent_Add(self, type, subtType):
+        # the current scene changed, build again on the next search
+        if type == self.scene_type:
+            self.built = False
+
+
+name_index = NameIndex()
+
+
+class Hints(lxifc.UIValueHints):
+    """ Popup listing one page of matches """
+    def __init__(self, matches: List[Tuple[str, str]]):
+        self.matches = matches
+
+    def uiv_Flags(self) -> int:
+        return lx.symbol.fVALHINT_POPUPS
+
+    def uiv_PopCount(self) -> int:
+        return len(self.matches)
+
+    def uiv_PopUserName(self, index: int) -> str:
+        return self.matches[index][1]
+
+    def uiv_PopInternalName(self, index: int) -> str:
+        return self.matches[index][0]
+
+
+class Command(lxu.command.BasicCommand):
+    """ Search meshes by name, print one page of the matches and let the user pick one of them from a popup. """
+    def __init__(self):
+        lxu.command.BasicCommand.__init__(self)
+        self.dyna_Add("filter", lx.symbol.sTYPE_STRING)
+        self.dyna_Add("match", lx.symbol.sTYPE_INTEGER)
+        self.dyna_SetHint(1, ((MATCH_PREFIX, "prefix"), (MATCH_SUBSTRING, "substring")))
+        self.dyna_Add("page", lx.symbol.sTYPE_INTEGER)
+        self.dyna_Add("pageSize", lx.symbol.sTYPE_INTEGER)
+        self.dyna_Add("item", "&item")
+
+        for index in range(5):
+            self.basic_SetFlags(index, lx.symbol.fCMDARG_OPTIONAL)
+
+    def cmd_DialogInit(self):
+        if not self.dyna_IsSet(3):
+            self.attr_SetInt(3, 50)
+
+    def page(self) -> Tuple[List[Tuple[str, str]], int]:
+        """ Return the current page of matches and the total number of matches. """
+        matches = name_index.search(self.dyna_String(0, ""), self.dyna_Int(1, MATCH_PREFIX))
+        size = max(1, self.dyna_Int(3, 50))
+        start = max(0, self.dyna_Int(2, 0)) * size
+        return matches[start:start + size], len(matches)
+
+    def arg_UIValueHints(self, index):
+        if index == 4:
+            return Hints(self.page()[0])
+
+    def basic_Execute(self, msg, flags):
+        if self.dyna_IsSet(4):
+            print(f"You picked {self.dyna_String(4)}")
+            return
+
+        matches, total = self.page()
+        page = max(0, self.dyna_Int(2, 0))
+        size = max(1, self.dyna_Int(3, 50))
+        lx.out(f"{SERVER_NAME} page {page + 1} of {max(1, -(-total // size))}, {total} matches")
+        for ident, name in matches:
+            lx.out(f"    {name} ({ident})")
+
+
+lx.bless(Command, SERVER_NAME)
@@ -4,49 +4,39 @@
 
 """
 
-from __future__ import annotations
-from typing import Tuple
-
+import time
 
 import lx
 import lxu
 import lxu.command
-import lxu.vector
 import lxifc
 
+from .bounds import Accumulator, BoundingBox, BoundsCache, format_box
+from .mesh_tracker import mesh_tracker
 
-class BoundingBox(object):
-    """ Bounding Box object, holding two points min & max to define the axis aligned bounds. """
-    def __init__(self,
-                 min_=(float("inf"), float("inf"), float("inf")),
-                 max_=(-float("inf"), -float("inf"), -float("inf"))):
-        self.min = min_
-        self.max = max_
-
-    @property
-    def extent(self):
-        return lxu.vector.sub(self.max, self.min)
 
-    def add(self, point: Tuple[float, float, float]):
-        """ Add a point to the bounding box, expanding it """
-        self.min = tuple(min(a, b) for a, b in zip(self.min, point))
-        self.max = tuple(max(a, b) for a, b in zip(self.max, point))
+bounds_cache = BoundsCache()  # bounds of previously scanned layers, kept across runs of the command
 
 
 class Visitor(lxifc.Visitor):
     """ We will use a visitor when walking through the points of a mesh. """
     def __init__(self, point: lx.object.Point):
         self.point = point
-        self.bound = BoundingBox()
+        self.accumulator = Accumulator()
 
     def vis_Evaluate(self):
         """ vis_Evaluate is called to process each element in an enumeration, this will get the point position and
-        expand the bounding box to include it. """
-        self.bound.add(self.point.Pos())
+        buffer it, the accumulator reduces the buffered positions into the bounding box a chunk at a time. """
+        self.accumulator.add(self.point.Pos())
 
 
 class Command(lxu.command.BasicCommand):
     """ Command will output to the log when fired. """
+
+    # Enable state shared by all instances, as (item selection stamp, enabled). The UI polls basic_Enable constantly
+    # while the command is visible, but the answer only changes with the item selection the notifier reports on.
+    enabled_cache = (None, False)
+
     def __init__(self):
         lxu.command.BasicCommand.__init__(self)
 
@@ -63,32 +53,72 @@ class Command(lxu.command.BasicCommand):
         self.item_notifier.RemoveClient(object_)
 
     def basic_Enable(self, msg) -> bool:
-        """ Test if the command should be enabled given the state of the system. """
+        """ Test if the command should be enabled given the state of the system, only walking the layers when the
+        item selection has changed since the last test. """
+        stamp, enabled = Command.enabled_cache
+        if stamp == mesh_tracker.item_selection:
+            return enabled
+
+        enabled = False
         layer_service = lx.service.Layer()
         layer_service.SetScene(0)
         for i in range(layer_service.Count()):
             if layer_service.Flags(i) & lx.symbol.f_LAYER_ACTIVE:
-                return True
+                enabled = True
+                break
 
-        return False
+        Command.enabled_cache = (mesh_tracker.item_selection, enabled)
+        return enabled
 
     def basic_Execute(self, msg, flags):
-        """ Get a layer scan for points in active layers and enumerate all the points in all layers. """
+        """ Get a layer scan for points in active layers and reduce the points of each layer that isn't cached to a
+        bounding box while reading them, then merge the boxes of all layers. """
         mesh_service = lx.service.Mesh()
         mode = mesh_service.ModeCompose("select", None)
 
-        point = lx.object.Point()  # note: will not have an interface and can not be used until given a valid point
-        visitor = Visitor(point)
-
         layer_service = lx.service.Layer()
         layer_scan = layer_service.ScanAllocate(lx.symbol.f_LAYER_ACTIVE | lx.symbol.f_LAYERSCAN_MARKVERTS)
-        for layer_index in range(layer_scan.Count()):
-            mesh = layer_scan.MeshInstance(layer_index)
-            point = mesh.PointAccessor()
-            visitor.point = point
-            point.Enumerate(mode, visitor, 0)
 
-        lx.out(f"py.mesh got box {visitor.bound.extent[0]}")
+        selection_service = lx.service.Selection()
+        time_ = selection_service.GetTime()
+
+        # Scan, each layer is reduced a chunk at a time as its points are visited so only one chunk is ever buffered.
+        # Layers that haven't changed since the last run are taken from the cache and not read at all,
+        start = time.perf_counter()
+        names, bounds = [], []
+        scanned = 0
+        for layer_index in range(layer_scan.Count()):
+            item = layer_scan.MeshItem(layer_index)
+            ident = item.Ident()
+            stamp = mesh_tracker.instance_key(item) + (time_,)  # bounds are of the evaluated, deformed mesh
+            names.append(item.UniqueName())
+
+            bound = bounds_cache.get(ident, stamp)
+            if bound is None:
+                mesh = layer_scan.MeshInstance(layer_index)
+                point = mesh.PointAccessor()
+                visitor = Visitor(point)
+                point.Enumerate(mode, visitor, 0)
+                bound = visitor.accumulator.result()
+                bounds_cache.put(ident, stamp, bound)
+                scanned += 1
+            bounds.append(bound)
+        reduced = time.perf_counter()
+
+        # Boxes from a previous scene or for meshes since removed are never hit again,
+        bounds_cache.prune(lambda ident, stamp: stamp[:2] == mesh_tracker.key(ident)[:2])
+
+        # Merge,
+        combined = BoundingBox.combined(bounds)
+        merged = time.perf_counter()
+
+        for name, bound in zip(names, bounds):
+            lx.out(f"py.mesh {name}: {format_box(bound)}")
+        lx.out(f"py.mesh combined: {format_box(combined)}")
+
+        lx.out("py.mesh timings: scan {:.1f} ms, merge {:.1f} ms".format(
+            (reduced - start) * 1000.0, (merged - reduced) * 1000.0))
+        lx.out(f"py.mesh cache: {scanned} of {len(bounds)} layers scanned, {bounds_cache.stats()}")
 
 
 lx.bless(Command, "py.mesh")
@@ -0,0 +1,137 @@
+"""
+
+    Listener keeping a change stamp per mesh item, for commands that want to cache results computed from meshes.
+
+    Every time a mesh channel is edited the stamp for that item goes up, so a cached value stored together with the
+    stamp it was computed at is still valid for as long as the stamp hasn't moved.
+
+    Component selection changes are counted per mesh as well, from the packet just added to the selection, since they
+    don't edit the mesh channel but change what "selected" components are. Removing components from a selection
+    doesn't say which mesh they were on, so it counts for every mesh that had components of that type selected.
+    Clearing the scene bumps a generation as idents can be reused by the next scene, and item selection changes are
+    counted, which is what decides the active layers.
+
+    Edits to channels other than the mesh channel are counted per item too, for results read from evaluated meshes.
+    instance_key combines them for the mesh and every item that can deform it, so moving a light leaves cached
+    results for meshes it doesn't deform alone.
+
+"""
+
+from typing import Dict, List, Set, Tuple
+
+import lx
+import lxifc
+
+from pysample_common.listener import Listener
+
+
+class MeshTracker(Listener, lxifc.SceneItemListener, lxifc.SelectionListener):
+    def __init__(self):
+        self.stamps = {}  # item ident -> number of edits seen
+        self.generation = 0  # number of scene clears seen
+        self.selection = 0  # number of component selection changes that couldn't be told apart by mesh
+        self.selections = {}  # type: Dict[str, int]  # mesh ident -> number of component selection changes seen
+        self.item_selection = 0  # number of item selection or current scene changes seen
+        self.edits = {}  # type: Dict[str, int]  # item ident -> number of edits to channels other than mesh seen
+
+        self.selection_service = lx.service.Selection()
+        self.translations = {  # component selection type -> packet translation for the mesh of a packet
+            self.selection_service.LookupType(lx.symbol.sSELTYP_VERTEX): lx.object.VertexPacketTranslation(
+                self.selection_service.Allocate(lx.symbol.sSELTYP_VERTEX)),
+            self.selection_service.LookupType(lx.symbol.sSELTYP_EDGE): lx.object.EdgePacketTranslation(
+                self.selection_service.Allocate(lx.symbol.sSELTYP_EDGE)),
+            self.selection_service.LookupType(lx.symbol.sSELTYP_POLYGON): lx.object.PolygonPacketTranslation(
+                self.selection_service.Allocate(lx.symbol.sSELTYP_POLYGON)),
+        }
+        self.selected = {type: set() for type in self.translations}  # type: Dict[int, Set[str]]
+        self.item_type = self.selection_service.LookupType(lx.symbol.sSELTYP_ITEM)
+        Listener.__init__(self)
+
+    def stamp(self, ident: str) -> int:
+        return self.stamps.get(ident, 0)
+
+    def key(self, ident: str) -> Tuple[int, int, int, int]:
+        """ Stamp for the scene, the mesh and its component selection, changes if any of them do. """
+        return self.generation, self.stamps.get(ident, 0), self.selection, self.selections.get(ident, 0)
+
+    @staticmethod
+    def deforming_items(item: lx.object.Item) -> List[lx.object.Item]:
+        """ The mesh item and every item that can change its evaluated mesh, the deformers linked to it, the items
+        linked to those such as falloffs, and the parents of all of them as their transforms move them. """
+        graph = lx.object.ItemGraph(item.Context().GraphLookup(lx.symbol.sGRAPH_DEFORMERS))
+        found = {}
+        pending = [item]
+        while pending:
+            current = pending.pop()
+            ident = current.Ident()
+            if ident in found:
+                continue
+
+            found[ident] = current
+            pending.extend(lx.object.Item(graph.RevByIndex(current, index)) for index in range(graph.RevCount(current)))
+            try:
+                parent = current.Parent()
+            except LookupError:
+                continue
+            if parent.test():
+                pending.append(parent)
+
+        return list(found.values())
+
+    def instance_key(self, item: lx.object.Item) -> tuple:
+        """ Like key, but also changes with channel edits on any item that could deform the evaluated mesh. """
+        deformers = tuple((deformer.Ident(), self.edits.get(deformer.Ident(), 0))
+                          for deformer in self.deforming_items(item))
+        return self.key(item.Ident()) + (deformers,)
+
+    def touch(self, ident: str):
+        self.stamps[ident] = self.stamps.get(ident, 0) + 1
+
+    def sil_ChannelValue(self, action, item, index):
+        item = lx.object.Item(item)
+        ident = item.Ident()
+        if item.ChannelName(index) == lx.symbol.sICHAN_MESH_MESH:
+            self.touch(ident)
+        else:
+            self.edits[ident] = self.edits.get(ident, 0) + 1
+
+    def sil_ItemRemove(self, item):
+        # bump rather than forget, so anything cached for an item with the same ident can't come back to life
+        self.touch(lx.object.Item(item).Ident())
+
+    def sil_SceneClear(self, scene):
+        self.generation += 1
+        self.item_selection += 1
+        self.stamps.clear()
+        self.selections.clear()
+        self.edits.clear()
+        for idents in self.selected.values():
+            idents.clear()
+
+    def selevent_Add(self, type, subtType):
+        translation = self.translations.get(type)
+        if translation is None:
+            if type == self.item_type or type == self.scene_type:
+                # switching the current scene changes the active layers without touching the item selection
+                self.item_selection += 1
+            return
+
+        try:
+            ident = translation.Item(self.selection_service.Recent(type)).Ident()
+        except LookupError:
+            self.selection += 1
+            return
+
+        self.selections[ident] = self.selections.get(ident, 0) + 1
+        self.selected[type].add(ident)
+
+    def selevent_Remove(self, type, subtType):
+        if type == self.item_type or type == self.scene_type:
+            self.item_selection += 1
+            return
+
+        for ident in self.selected.get(type, ()):
+            self.selections[ident] = self.selections.get(ident, 0) + 1
+
+
+mesh_tracker = MeshTracker()  # shared by all commands caching per mesh results
@@ -0,0 +1,108 @@
+"""
+
+    Index from item ident to the schematic group and node showing that item.
+
+    Built by walking every schematic group once, then kept until a scene or graph event marks it dirty. Entries store
+    the group ident and the node index, and are checked against the node's item on lookup so an index that went stale
+    without us hearing about it gets rebuilt instead of returning the wrong node. The index holds every node, so an item
+    without an entry in a clean index has no node and is reported missing without walking the groups again.
+
+"""
+
+from __future__ import annotations
+from typing import Tuple
+
+import lx
+import lxifc
+
+from pysample_common.listener import Listener
+
+
+class SchematicIndex(Listener, lxifc.SceneItemListener, lxifc.SelectionListener):
+    def __init__(self):
+        self.nodes = {}  # item ident -> (group item ident, node index)
+        self.dirty = True
+        Listener.__init__(self)
+
+    def rebuild(self, scene: lx.object.Scene):
+        """ Walk all group items in scene with the schematic group interface and record every node. """
+        self.nodes = {}
+        schematic_group = lx.object.SchematicGroup()
+        group_type = lx.service.Scene().ItemTypeLookup(lx.symbol.sITYPE_GROUP)  # type: int
+        for group_index in range(scene.ItemCount(group_type)):
+            group_item = scene.ItemByIndex(group_type, group_index)  # type: lx.object.Item
+            if not schematic_group.set(group_item):  # see if the item has the interface for schematic group or skip
+                continue
+
+            group_ident = group_item.Ident()
+            for node_index in range(schematic_group.NodeCount()):
+                ident = schematic_group.NodeByIndex(node_index).Item().Ident()
+                self.nodes.setdefault(ident, (group_ident, node_index))  # first group wins, same as a linear search
+
+        self.dirty = False
+
+    def resolve(self, item: lx.object.Item) -> Tuple[lx.object.SchematicGroup, lx.object.SchematicNode]:
+        """ Return group and node for the indexed item, or None if the entry is missing or stale. """
+        entry = self.nodes.get(item.Ident())
+        if entry is None:
+            return None
+
+        group_ident, node_index = entry
+        schematic_group = lx.object.SchematicGroup()
+        try:
+            group_item = item.Context().ItemLookup(group_ident)
+        except LookupError:
+            return None
+
+        if not schematic_group.set(group_item) or node_index >= schematic_group.NodeCount():
+            return None
+
+        schematic_node = schematic_group.NodeByIndex(node_index)  # type: lx.object.SchematicNode
+        if schematic_node.Item().Ident() != item.Ident():
+            return None
+
+        return schematic_group, schematic_node
+
+    def lookup(self, item: lx.object.Item) -> Tuple[lx.object.SchematicGroup, lx.object.SchematicNode]:
+        """ Return group and node for the item or raise LookupError, rebuilding at most once if the index is dirty or
+        its entry for the item went stale. Items without an entry are missing, a rebuild wouldn't find them either. """
+        rebuilt = self.dirty
+        if rebuilt:
+            self.rebuild(item.Context())
+
+        if item.Ident() not in self.nodes:
+            raise LookupError("Failed to find schematic group and node")
+
+        found = self.resolve(item)
+        if found is None and not rebuilt:
+            self.rebuild(item.Context())
+            found = self.resolve(item)
+
+        if found is None:
+            raise LookupError("Failed to find schematic group and node")
+
+        return found
+
+    # Anything that can add, remove or reorder nodes marks the index dirty,
+    def sil_ItemAdd(self, item):
+        self.dirty = True
+
+    def sil_ItemRemove(self, item):
+        self.dirty = True
+
+    def sil_LinkAdd(self, graph, itemFrom, itemTo):
+        self.dirty = True
+
+    def sil_LinkRemBefore(self, graph, itemFrom, itemTo):
+        self.dirty = True
+
+    def sil_SceneClear(self, scene):
+        self.dirty = True
+
+    def selevent_Add(self, type, subtType):
+        # the current scene changed
+        if type == self.scene_type:
+            self.dirty = True
+
+
+schematic_index = SchematicIndex()
@@ -0,0 +1,117 @@
+"""
+
+    Companion to py.vmap.hints, listing the vertex maps on all selected meshes at once along with how many points
+    have a value in each map, and the maps the meshes have in common.
+
+    Catalogs are cached per mesh and only rebuilt when the mesh tracker has seen the mesh being edited.
+
+"""
+
+from typing import List, NamedTuple
+
+import lx
+import lxifc
+import lxu.command
+
+from .mesh_tracker import mesh_tracker
+
+
+SERVER_NAME = "py.vmap.catalog"
+
+
+class MapInfo(NamedTuple):
+    name: str
+    type: str
+    covered: int  # number of points with a value in the map
+    points: int
+
+
+class Visitor(lxifc.Visitor):
+    """ Visits each vertex map on a mesh and counts the points that have a value in it. """
+    def __init__(self, mesh: lx.object.Mesh, meshmap: lx.object.MeshMap):
+        self.mesh_service = lx.service.Mesh()
+        self.meshmap = meshmap
+        self.point = mesh.PointAccessor()
+        self.count = mesh.PointCount()
+        self.maps = []
+
+    def covered(self, map_id, dimension: int) -> int:
+        value = lx.object.storage("f", max(dimension, 1))
+        covered = 0
+        for index in range(self.count):
+            self.point.SelectByIndex(index)
+            try:
+                if self.point.MapValue(map_id, value):
+                    covered += 1
+            except LookupError:  # no value for this point
+                continue
+        return covered
+
+    def vis_Evaluate(self):
+        map_type = self.meshmap.Type()
+        covered = self.covered(self.meshmap.ID(), self.meshmap.Dimension())
+        type_name = self.mesh_service.VMapLookupName(map_type)
+        self.maps.append(MapInfo(self.meshmap.Name(), type_name, covered, self.count))
+
+
+class Catalog(object):
+    """ Vertex map catalog per mesh ident, each stored with the mesh tracker key it was built at. """
+    def __init__(self):
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, ident: str, mesh: lx.object.Mesh) -> List[MapInfo]:
+        key = mesh_tracker.key(ident)[:2]  # component selection doesn't matter here
+        entry = self.entries.get(ident)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        meshmap = mesh.MeshMapAccessor()
+        visitor = Visitor(mesh, meshmap)
+        meshmap.Enumerate(lx.symbol.iMARK_ANY, visitor, 0)
+        self.entries[ident] = (key, visitor.maps)
+        return visitor.maps
+
+
+catalog = Catalog()
+
+
+class Command(lxu.command.BasicCommand):
+    """ Print the vertex maps of every active mesh, optionally only maps of one type like "txuv", followed by the
+    maps all of them share. """
+    def __init__(self):
+        lxu.command.BasicCommand.__init__(self)
+        self.dyna_Add("type", lx.symbol.sTYPE_STRING)
+        self.basic_SetFlags(0, lx.symbol.fCMDARG_OPTIONAL)
+
+    def basic_Execute(self, msg, flags):
+        type_filter = self.dyna_String(0, "")
+
+        layer_service = lx.service.Layer()
+        layer_scan = layer_service.ScanAllocate(lx.symbol.f_LAYERSCAN_ACTIVE)
+        if not layer_scan.test():
+            return
+
+        common = None
+        for layer_index in range(layer_scan.Count()):
+            item = layer_scan.MeshItem(layer_index)
+            maps = catalog.get(item.Ident(), layer_scan.MeshBase(layer_index))
+            if type_filter:
+                maps = [info for info in maps if info.type == type_filter]
+
+            lx.out(f"{SERVER_NAME} {item.UniqueName()}:")
+            for info in maps:
+                lx.out(f"    {info.name} ({info.type}) {info.covered}/{info.points} points")
+
+            names = {(info.name, info.type) for info in maps}
+            common = names if common is None else common & names
+
+        for name, type_name in sorted(common or ()):
+            lx.out(f"{SERVER_NAME} common: {name} ({type_name})")
+        lx.out(f"{SERVER_NAME} cache: {catalog.hits} hits, {catalog.misses} misses")
+
+
+lx.bless(Command, SERVER_NAME)
@@ -1,29 +1,86 @@
+from typing import List
+
 import lx
 import lxu
+import lxu.command
 import lxu.meta
 import lxu.select
 import lxu.object
 
 
+SIZE_COMMAND = "py.drop.copySize"
+
+
+class SizeCommand(lxu.command.BasicCommand):
+    """ Write size to the size channel of every locator in items, a space separated list of idents. Being an undoable
+    command the channel writes are recorded for undo, which writing from the drop action directly would not be. """
+    def __init__(self):
+        lxu.command.BasicCommand.__init__(self)
+        self.dyna_Add("size", lx.symbol.sTYPE_DISTANCE)
+        self.dyna_Add("items", lx.symbol.sTYPE_STRING)
+
+    def cmd_Flags(self):
+        return lx.symbol.fCMD_MODEL | lx.symbol.fCMD_UNDO
+
+    def basic_Execute(self, msg, flags):
+        size = self.dyna_Float(0, 1.0)
+        scene = lxu.select.SceneSelection().current()
+        channel_write = lx.object.ChannelWrite(
+            scene.Channels(lx.symbol.s_ACTIONLAYER_EDIT, lx.service.Selection().GetTime()))
+
+        # Arguments are strings so the command can be recorded and redone, which leaves looking the items up again by
+        # ident. The size channel has the same index on every item of a type, so that is only looked up once per type.
+        lookup = scene.ItemLookup
+        indices = {}
+        for ident in self.dyna_String(1, "").split():
+            item = lookup(ident)  # type: lx.object.Item
+            item_type = item.Type()
+            index = indices.get(item_type)
+            if index is None:
+                index = indices[item_type] = item.ChannelLookup(lx.symbol.sICHAN_LOCATOR_SIZE)
+            channel_write.Double(item, index, size)
+
+
+lx.bless(SizeCommand, SIZE_COMMAND)
+
+
 class Drop(lxu.meta.Drop):
     def __init__(self):
         super(Drop, self).__init__()
         self.drag_list = lx.object.ValueArray()
+        self.drag_any = False  # whether the payload holds any locator
+        self.drag_items = None  # type: List[lx.object.Item]  # locators being dragged, resolved when first needed
         self.drop_item = lx.object.Drop()
 
-    def recognize_array(self, array: lxu.object.ValueArray):
+    @staticmethod
+    def iter_locators(array: lxu.object.ValueArray):
+        """ Look up the items in the drag payload, yielding the ones that are locators. """
+        scene = lxu.select.SceneSelection().current()
         for index in range(array.Count()):
             reference = array.GetValue(index)  # type: lx.object.Value
             if reference.TypeName() == "&item":
-                item_id = reference.GetString()
-                item = lxu.select.SceneSelection().current().ItemLookup(item_id)  # type: lx.object.Item
+                item = scene.ItemLookup(reference.GetString())  # type: lx.object.Item
                 if item.TestType(lx.symbol.i_CIT_LOCATOR):
-                    self.drag_list.set(array)
-                    return True
+                    yield item
 
-        return False
+    def locators(self) -> List[lx.object.Item]:
+        """ All locators being dragged, resolved once per drag. """
+        if self.drag_items is None:
+            self.drag_items = list(self.iter_locators(self.drag_list))
+        return self.drag_items
+
+    def recognize_array(self, array: lxu.object.ValueArray):
+        # Modo keeps asking while hovering, so stop at the first locator rather than resolving the whole payload. The
+        # resolved items are left for the drop, and forgotten here as the payload may be a new drag.
+        self.drag_list.set(array)
+        self.drag_items = None
+        self.drag_any = next(self.iter_locators(array), None) is not None
+        return self.drag_any
 
     def enabled(self, destination):
+        if not self.drag_any:
+            return False
+
         # Attempting to "cast" the destination to LocatorDest object,
         # if it raises no interface, well it's not supported.
         try:
@@ -35,35 +92,29 @@ class Drop(lxu.meta.Drop):
         except Exception as e:
             return False
 
+        return False
+
     def perform_drop(self):
-        """ Copy the size of the destination locator, to change all items being dragged. """
+        """ Copy the size of the destination locator, to change all items being dragged. Rather than selecting the
+        items and running item.channel for them, a single undoable command writes the size to all of them. """
         command_service = lx.service.Command()
         selection_service = lx.service.Selection()
 
         command_service.BlockBegin("python Drop Actions", 0)
 
-        mode = "set"
         scene = lxu.select.SceneSelection().current()
-
-        # TODO: We should make this section into a function, as it's same used for recognize
-        for index in range(self.drag_list.Count()):
-            reference = self.drag_list.GetValue(index)
-            if reference.TypeName() == "&item":
-                item_id = reference.GetString()
-                item = scene.ItemLookup(item_id)  # type: lx.object.Item
-                if item.TestType(lx.symbol.i_CIT_LOCATOR):
-                    flag, _, command = command_service.SpawnFromString(f"select.item {item_id} {mode}")
-                    command.Execute(flag)
-                    mode = "add"
-
         channel_read = lx.object.ChannelRead(scene.Channels(None, selection_service.GetTime()))
         size = channel_read.Double(self.drop_item, self.drop_item.ChannelLookup(lx.symbol.sICHAN_LOCATOR_SIZE))
 
-        flag, _, command = command_service.SpawnFromString(f"item.channel {lx.symbol.sICHAN_LOCATOR_SIZE} {size}")
+        idents = " ".join(item.Ident() for item in self.locators())
+        flag, _, command = command_service.SpawnFromString(f'{SIZE_COMMAND} {size} "{idents}"')
         command.Execute(flag)
 
         command_service.BlockEnd()
 
+        # the drag is over, don't hold on to its items
+        self.drag_items = None
+
 
 class DropAction(lxu.meta.DropAction):
     def exec_act(self):
@@ -1 +1,2 @@
 from . import falloff_box
+from . import falloff_radial
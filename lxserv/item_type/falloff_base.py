@@ -0,0 +1,54 @@
+"""
+
+    Falloff object and modifier shared by the falloff items, built on the kernels in falloff_kernel.
+
+    An item only needs a Falloff subclass returning its kernel from make_kernel, and registers Modifier as its
+    EvalModifier.
+
+"""
+
+
+from array import array
+from typing import Sequence
+
+import lx
+import lxu.meta
+import lxu.object
+
+from . import falloff_kernel
+
+
+DEBUG = False  # log every weight evaluation, this is called per sample so only turn on when debugging
+
+
+class KernelFalloff(lxu.meta.Falloff):
+    """ Weights come from the kernel set up in Modifier.init_obj, which asks make_kernel for it. """
+    kernel = falloff_kernel.Kernel()  # replaced with one matching the channels in Modifier.init_obj
+
+    def make_kernel(self, rows: falloff_kernel.Matrix) -> falloff_kernel.Kernel:
+        """ Kernel for the falloff given the rows of the world inverse, a unit box with constant weight unless the
+        item overrides it. """
+        return falloff_kernel.Kernel(falloff_kernel.BOX, falloff_kernel.CONSTANT, rows)
+
+    def weight_local(self, pos):
+        if DEBUG:
+            lx.out(f"weight_local: {pos}")
+        return self.kernel.weight_local(pos)
+
+    def weight_batch(self, positions: Sequence[float]) -> array:
+        """ Weights for a flat array of world positions, transformed into local space with the world inverse set up
+        in Modifier.init_obj. """
+        return self.kernel.weights(positions)
+
+
+class Modifier(lxu.meta.EvalModifier, lxu.meta.ObjectEvaluation):
+    def bind(self, item: lxu.object.Item, ident: int):
+        self.mod_add_chan(item, lx.symbol.sICHAN_XFRMCORE_WORLDMATRIX)
+
+    def init_obj(self, mod: lxu.meta.EvalModifier, obj):
+        if DEBUG:
+            lx.out(f"init_obj: mod = {type(mod)} obj = {type(obj)}")
+        obj = mod.mod_read_attr()
+        xfrm = mod.mod_cust_value(0)
+        obj.world_inverse = xfrm.inverse()
+        obj.kernel = obj.make_kernel(falloff_kernel.matrix_rows(obj.world_inverse))
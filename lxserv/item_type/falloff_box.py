@@ -10,6 +10,9 @@ import lxu.meta
 import lxu.object
 import lxu.attrdesc
 
+from . import falloff_kernel
+from .falloff_base import KernelFalloff, Modifier
+
 
 class Channels(lxu.meta.Channels):
     def init_chan(self, desc: lxu.attrdesc.AttributeDesc):
@@ -19,16 +22,10 @@ class Channels(lxu.meta.Channels):
 chan_meta = lxu.meta.Meta_Channels(Channels)
 
 
-class Falloff(lxu.meta.Falloff, Channels):
-    def weight_local(self, pos):
-        lx.out(f"weight_local: {pos}")
-        if any(abs(x) > 1.0 for x in pos):
-            return 0.0
-
-        if (self.distance):
-            return 1.0 - (abs(pos[0]) + abs(pos[1]) + abs(pos[2]) / 3.0)
-
-        return 1.0
+class Falloff(KernelFalloff, Channels):
+    def make_kernel(self, rows: falloff_kernel.Matrix) -> falloff_kernel.Kernel:
+        curve = falloff_kernel.LINEAR if self.distance else falloff_kernel.CONSTANT
+        return falloff_kernel.Kernel(falloff_kernel.BOX, curve, rows)
 
 
 class ViewItem3D(lxu.meta.ViewItem3D):
@@ -39,17 +36,6 @@ class ViewItem3D(lxu.meta.ViewItem3D):
         stroke.Vertex3(1.0, 1.0, 1.0, lx.symbol.iSTROKE_ABSOLUTE)
 
 
-class Modifier(lxu.meta.EvalModifier, lxu.meta.ObjectEvaluation):
-    def bind(self, item: lxu.object.Item, ident: int):
-        self.mod_add_chan(item, lx.symbol.sICHAN_XFRMCORE_WORLDMATRIX)
-
-    def init_obj(self, mod: lxu.meta.EvalModifier, obj):
-        lx.out(f"init_obj: mod = {type(mod)} obj = {type(obj)}")
-        obj = mod.mod_read_attr()
-        xfrm = mod.mod_cust_value(0)
-        obj.world_inverse = xfrm.inverse()
-
-
 pkg_meta = lxu.meta.Meta_Package("py.falloff.box")
 v3d_meta = lxu.meta.Meta_ViewItem3D(ViewItem3D)
 
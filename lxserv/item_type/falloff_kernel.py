@@ -0,0 +1,117 @@
+"""
+
+    Falloff weights shared by the falloff items, for one position or many positions at once.
+
+    A kernel combines a shape, which turns local positions into a normalized distance where anything past 1.0 is
+    outside of the falloff, with a curve mapping that distance to a weight. New shapes only need their distance
+    functions, for many positions and for a single one, added to SHAPES.
+
+    Positions are flat arrays of doubles (x, y, z, x, y, z, ...). The batched path splits them into one sequence per
+    axis and computes all weights in a few comprehensions, which avoids a Python method call per sample. The lx side,
+    the falloff object and modifier, is in falloff_base.
+
+"""
+
+from array import array
+from math import sqrt
+from typing import List, Sequence, Tuple
+
+Matrix = Tuple[Tuple[float, float, float, float], ...]  # four rows, offset in the last row like lx.object.Matrix
+
+IDENTITY = ((1.0, 0.0, 0.0, 0.0), (0.0, 1.0, 0.0, 0.0), (0.0, 0.0, 1.0, 0.0), (0.0, 0.0, 0.0, 1.0))
+
+BOX, RADIAL = "box", "radial"
+CONSTANT, LINEAR, SMOOTH = 0, 1, 2
+
+OUTSIDE = 2.0  # distance given to positions outside of a shape
+
+
+def matrix_rows(matrix) -> Matrix:
+    """ Get the four rows from a matrix object, or a nested sequence of rows. """
+    if hasattr(matrix, "Get4"):
+        matrix = matrix.Get4()
+    return tuple(tuple(float(value) for value in row) for row in matrix)
+
+
+def transform(rows: Matrix, positions: Sequence[float]) -> Tuple[Sequence[float], Sequence[float], Sequence[float]]:
+    """ Transform a flat array of positions by rows, returning one sequence per axis. """
+    xs, ys, zs = positions[0::3], positions[1::3], positions[2::3]
+    if rows == IDENTITY:
+        return xs, ys, zs
+
+    (a, b, c, _), (d, e, f, _), (g, h, i, _), (tx, ty, tz, _) = rows
+    if not (b or c or d or f or g or h):  # only scale and translation, each axis on its own
+        return [x * a + tx for x in xs], [y * e + ty for y in ys], [z * i + tz for z in zs]
+
+    return ([x * a + y * d + z * g + tx for x, y, z in zip(xs, ys, zs)],
+            [x * b + y * e + z * h + ty for x, y, z in zip(xs, ys, zs)],
+            [x * c + y * f + z * i + tz for x, y, z in zip(xs, ys, zs)])
+
+
+def box_distance(x: float, y: float, z: float) -> float:
+    """ Unit box, the distance is the average of the absolute coordinates like the SDK sample. """
+    x, y, z = abs(x), abs(y), abs(z)
+    if x > 1.0 or y > 1.0 or z > 1.0:
+        return OUTSIDE
+    return (x + y + z) / 3.0
+
+
+def box_distances(xs, ys, zs) -> List[float]:
+    return [OUTSIDE if x > 1.0 or y > 1.0 or z > 1.0 else (x + y + z) / 3.0
+            for x, y, z in zip(map(abs, xs), map(abs, ys), map(abs, zs))]
+
+
+def radial_distance(x: float, y: float, z: float) -> float:
+    """ Unit sphere, the distance is the distance from the center. """
+    return sqrt(x * x + y * y + z * z)
+
+
+def radial_distances(xs, ys, zs) -> List[float]:
+    return [sqrt(x * x + y * y + z * z) for x, y, z in zip(xs, ys, zs)]
+
+
+SHAPES = {  # shape -> (distances for many positions, distance for one position)
+    BOX: (box_distances, box_distance),
+    RADIAL: (radial_distances, radial_distance),
+}
+
+
+def curve_value(distance: float, curve: int) -> float:
+    """ Weight for a single normalized distance, same as apply_curve. """
+    if distance > 1.0:
+        return 0.0
+    if curve == CONSTANT:
+        return 1.0
+    t = 1.0 - distance
+    if curve == LINEAR:
+        return t
+    return t * t * (3.0 - 2.0 * t)
+
+
+def apply_curve(distances: List[float], curve: int) -> array:
+    """ Map normalized distances to weights, everything past 1.0 gets zero. """
+    if curve == CONSTANT:
+        return array("d", [0.0 if d > 1.0 else 1.0 for d in distances])
+
+    if curve == LINEAR:
+        return array("d", [0.0 if d > 1.0 else 1.0 - d for d in distances])
+
+    ts = [0.0 if d > 1.0 else 1.0 - d for d in distances]
+    return array("d", [t * t * (3.0 - 2.0 * t) for t in ts])
+
+
+class Kernel(object):
+    """ Falloff shape and curve together with the inverse world transform, computed once when the falloff is set up
+    and then used for every evaluation. """
+    def __init__(self, shape: str = BOX, curve: int = CONSTANT, rows: Matrix = IDENTITY):
+        self.distances, self.distance = SHAPES[shape]
+        self.curve = curve
+        self.rows = rows
+
+    def weight_local(self, pos: Tuple[float, float, float]) -> float:
+        """ Weight for one position already in the local space of the falloff. """
+        return curve_value(self.distance(pos[0], pos[1], pos[2]), self.curve)
+
+    def weights(self, positions: Sequence[float]) -> array:
+        """ Weights for a flat array of world positions. """
+        return apply_curve(self.distances(*transform(self.rows, positions)), self.curve)
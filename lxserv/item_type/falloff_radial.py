@@ -0,0 +1,82 @@
+"""
+
+    cc_falloff_radial.cpp
+
+    Built on the same falloff object and modifier as the box falloff from falloff_base, only the shape and the curve
+    differ.
+
+"""
+
+
+from math import cos, pi, sin
+
+import lx
+import lxu.meta
+import lxu.object
+import lxu.attrdesc
+
+from . import falloff_kernel
+from .falloff_base import KernelFalloff, Modifier
+
+
+CIRCLE_SEGMENTS = 48  # number of segments drawn for each circle of the sphere
+
+
+class Channels(lxu.meta.Channels):
+    def init_chan(self, desc: lxu.attrdesc.AttributeDesc):
+        desc.add("smooth", lx.symbol.sTYPE_BOOLEAN)
+
+
+chan_meta = lxu.meta.Meta_Channels(Channels)
+
+
+class Falloff(KernelFalloff, Channels):
+    def make_kernel(self, rows: falloff_kernel.Matrix) -> falloff_kernel.Kernel:
+        curve = falloff_kernel.SMOOTH if self.smooth else falloff_kernel.LINEAR
+        return falloff_kernel.Kernel(falloff_kernel.RADIAL, curve, rows)
+
+
+# The unit circle is the same for every redraw, so compute it once
+CIRCLE = tuple((cos(2.0 * pi * i / CIRCLE_SEGMENTS), sin(2.0 * pi * i / CIRCLE_SEGMENTS))
+               for i in range(CIRCLE_SEGMENTS))
+
+
+class ViewItem3D(lxu.meta.ViewItem3D):
+    def draw(self, chanread, stroke, flags, color):
+        """ Draw the unit sphere as one circle around each axis """
+        alpha = 1.0 if (flags & lx.symbol.iSELECTION_SELECTED) else 0.5
+        for axis in range(3):
+            stroke.BeginW(lx.symbol.iSTROKE_LINE_LOOP, color, alpha, 2*alpha)
+            for a, b in CIRCLE:
+                position = [a, b]
+                position.insert(axis, 0.0)
+                stroke.Vertex3(position[0], position[1], position[2], lx.symbol.iSTROKE_ABSOLUTE)
+
+
+pkg_meta = lxu.meta.Meta_Package("py.falloff.radial")
+v3d_meta = lxu.meta.Meta_ViewItem3D(ViewItem3D)
+
+mod_meta = lxu.meta.Meta_EvalModifier("py.falloff.radial", Modifier)
+eval_meta = lxu.meta.Meta_ObjectEvaluation(lx.symbol.sICHAN_FALLOFF_FALLOFF)
+
+fall_meta = lxu.meta.Meta_Falloff(Falloff)
+
+
+class Root(lxu.meta.MetaRoot):
+    def pre_init(self):
+        pkg_meta.set_supertype(lx.symbol.sITYPE_FALLOFF)
+        fall_meta.set_local()
+
+        self.add(chan_meta)
+        self.add(pkg_meta)
+        self.add(mod_meta)
+
+        pkg_meta.add(v3d_meta)
+
+        mod_meta.add(eval_meta)
+        eval_meta.add(fall_meta)
+
+        return False
+
+
+root_meta = Root()
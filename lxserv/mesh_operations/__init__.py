@@ -1,2 +1,3 @@
 from . import create_vertex
 from . import select_random
+from . import select_batch
@@ -2,14 +2,22 @@
 
     Python version of pmodel_createVertex.cpp
 
+    Extended to create count points in a pattern around position, a grid, a line or scattered in a box, or the points
+    of a mesh linked through the schematic. Patterns are computed as one array and cached on the channel values.
+
 """
 
+from array import array
+from typing import Optional
 
 import lx
 import lxifc
 
+from . import patterns
+
 
 SERVER_NAME = "py.create.vertex"
+GRAPH = SERVER_NAME + ".graph"  # schematic graph linking a mesh to take the points from
 
 
 class Instance(lxifc.PackageInstance):
@@ -37,6 +45,23 @@ class Package(lxifc.Package, lxifc.ChannelUI):
         add_channel.SetVector(lx.symbol.sCHANVEC_XYZ)
         add_channel.SetDefaultVec(position)
 
+        # the pattern, see patterns.GRID, LINE, RANDOM and MESH, spans size around position
+        add_channel.NewChannel('count', lx.symbol.sTYPE_INTEGER)
+        add_channel.SetDefault(0.0, 1)
+        add_channel.NewChannel('pattern', lx.symbol.sTYPE_INTEGER)
+        add_channel.SetDefault(0.0, patterns.GRID)
+        # text hints so the channel shows up as a popup of the pattern names
+        add_channel.SetHint(((patterns.GRID, "grid"), (patterns.LINE, "line"), (patterns.RANDOM, "random"),
+                             (patterns.MESH, "mesh")))
+        add_channel.NewChannel('seed', lx.symbol.sTYPE_INTEGER)
+        add_channel.SetDefault(0.0, 0)
+
+        size = lx.object.storage('d', 3)
+        size.set((1.0, 1.0, 1.0))
+        add_channel.NewChannel('size', lx.symbol.sTYPE_DISTANCE)
+        add_channel.SetVector(lx.symbol.sCHANVEC_XYZ)
+        add_channel.SetDefaultVec(size)
+
     def pkg_TestInterface(self, guid):
         """ This method is required so that 'nexus' knows what interfaces instance of this support. """
         return lx.service.GUID().Compare(guid, lx.symbol.u_PACKAGEINSTANCE) == 0
@@ -48,9 +73,9 @@ class Package(lxifc.Package, lxifc.ChannelUI):
 
 
 class MeshOperation(lxifc.MeshOperation):
-    """ MeshOperation implementation that modifies a mesh by adding a vertex """
+    """ MeshOperation implementation that modifies a mesh by adding vertices """
     def __init__(self):
-        self.position = (0.0, 0.0, 0.0)
+        self.positions = array('d', (0.0, 0.0, 0.0))  # flat array of positions to add, shared with the pattern cache
 
     def mop_Evaluate(self, mesh, type, mode):
         """ Evalutate the MeshOp by modifying the input mesh. """
@@ -62,8 +87,11 @@ class MeshOperation(lxifc.MeshOperation):
         if not point.test():
             return
 
-        # create a new vertex at position,
-        point.New(self.position)
+        # create all the vertices, then tell the mesh about the edit once
+        new = point.New
+        positions = self.positions
+        for position in zip(positions[0::3], positions[1::3], positions[2::3]):
+            new(position)
         mesh.SetMeshEdits(lx.symbol.f_MESHEDIT_GEOMETRY)
 
 
@@ -82,6 +110,20 @@ class ModifierElement(lxifc.Modifier):
         self.position_y_index = evaluation.AddChannelName(item, "position.Y", lx.symbol.fECHAN_READ)
         self.position_z_index = evaluation.AddChannelName(item, "position.Z", lx.symbol.fECHAN_READ)
 
+        self.count_index = evaluation.AddChannelName(item, "count", lx.symbol.fECHAN_READ)
+        self.pattern_index = evaluation.AddChannelName(item, "pattern", lx.symbol.fECHAN_READ)
+        self.seed_index = evaluation.AddChannelName(item, "seed", lx.symbol.fECHAN_READ)
+        self.size_x_index = evaluation.AddChannelName(item, "size.X", lx.symbol.fECHAN_READ)
+        self.size_y_index = evaluation.AddChannelName(item, "size.Y", lx.symbol.fECHAN_READ)
+        self.size_z_index = evaluation.AddChannelName(item, "size.Z", lx.symbol.fECHAN_READ)
+
+        # If a mesh is linked, read its mesh channel for the MESH pattern
+        self.mesh_index = None  # type: Optional[int]
+        graph = lx.object.ItemGraph(item.Context().GraphLookup(GRAPH))
+        if graph.RevCount(item):
+            linked_item = lx.object.Item(graph.RevByIndex(item, 0))
+            self.mesh_index = evaluation.AddChannelName(linked_item, lx.symbol.sICHAN_MESH_MESH, lx.symbol.fECHAN_READ)
+
         # And set meshop as out
         self._output_index = evaluation.AddChannelName(item, lx.symbol.sICHAN_MESHOP_OBJ, lx.symbol.fECHAN_WRITE)
 
@@ -104,7 +146,40 @@ class ModifierElement(lxifc.Modifier):
             self.attr.GetFlt(self.position_z_index),
         )
 
-        mesh_operation.position = position
+        pattern = self.attr.GetInt(self.pattern_index)
+        if pattern == patterns.MESH:
+            mesh_operation.positions = self.linked_positions()
+            return
+
+        size = (
+            self.attr.GetFlt(self.size_x_index),
+            self.attr.GetFlt(self.size_y_index),
+            self.attr.GetFlt(self.size_z_index),
+        )
+        count = max(0, self.attr.GetInt(self.count_index))
+        seed = self.attr.GetInt(self.seed_index)
+        mesh_operation.positions = patterns.pattern_cache.get(pattern, count, position, size, seed)
+
+    def linked_positions(self) -> array:
+        """ Positions of all points on the linked mesh, the modifier only evaluates again when that mesh changes so
+        there is nothing to cache here. """
+        positions = array('d')
+        if self.mesh_index is None:
+            return positions
+
+        mesh_filter = lx.object.MeshFilter(self.attr.Value(self.mesh_index, False))
+        if not mesh_filter.test():
+            return positions
+
+        mesh = mesh_filter.Generate()
+        if not mesh.test():
+            return positions
+
+        point = mesh.PointAccessor()
+        for index in range(mesh.PointCount()):
+            point.SelectByIndex(index)
+            positions.extend(point.Pos())
+        return positions
 
 
 class ModifierServer(lxifc.EvalModifier):
@@ -138,12 +213,35 @@ class ModifierServer(lxifc.EvalModifier):
         return ModifierElement(item, evaluation)
 
 
-tags = {lx.symbol.sMOD_TYPELIST: SERVER_NAME}
+class Schematic(lxifc.SchematicConnection):
+    """ Connection point on the meshop for linking a single mesh to take points from. """
+    def __init__(self):
+        scene_service = lx.service.Scene()
+        self.item_type = scene_service.ItemTypeLookup(SERVER_NAME)
+        self.mesh_type = scene_service.ItemTypeLookup(lx.symbol.sITYPE_MESH)
+
+    def schm_ItemFlags(self, item) -> int:
+        item = lx.object.Item(item)
+        if item.Type() == self.item_type:
+            return lx.symbol.fSCON_SINGLE
+        return 0
+
+    def schm_AllowConnect(self, from_obj, to_obj) -> bool:
+        return lx.object.Item(from_obj).TestType(self.mesh_type)
+
+    def schm_GraphName(self):
+        return GRAPH
+
+
+lx.bless(Schematic, GRAPH, {lx.symbol.sSRV_USERNAME: "Points From"})
+
+tags = {lx.symbol.sMOD_TYPELIST: SERVER_NAME, lx.symbol.sMOD_GRAPHLIST: GRAPH}
 lx.bless(ModifierServer, SERVER_NAME + ".mod", tags)
 
 tags = {  # Trying to match the descInfo[] on the package in the sdk,
     lx.symbol.sPKG_SUPERTYPE: lx.symbol.sITYPE_MESHOP,
     lx.symbol.sPMODEL_SELECTIONTYPES: lx.symbol.sSELOP_TYPE_NONE,
-    lx.symbol.sPMODEL_NOTRANSFORM: "."
+    lx.symbol.sPMODEL_NOTRANSFORM: ".",
+    lx.symbol.sPKG_GRAPHS: GRAPH,
 }
 lx.bless(Package, SERVER_NAME, tags)
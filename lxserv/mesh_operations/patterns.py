@@ -0,0 +1,86 @@
+"""
+
+    Point patterns for py.create.vertex, each returned as a flat array of doubles (x, y, z, x, y, z, ...).
+
+    Every pattern is placed by a center and a size, and computed in a few comprehensions rather than a call per point.
+
+"""
+
+import random
+from array import array
+from math import ceil, sqrt
+from typing import Tuple
+
+Vector = Tuple[float, float, float]
+
+# Patterns, the values of the pattern channel. MESH takes the points of a linked mesh and is not computed here.
+GRID, LINE, RANDOM, MESH = 0, 1, 2, 3
+
+
+def interleave(xs, ys, zs) -> array:
+    """ Flat array of positions from one sequence per axis. """
+    positions = array("d", bytes(len(xs) * 3 * 8))
+    positions[0::3], positions[1::3], positions[2::3] = array("d", xs), array("d", ys), array("d", zs)
+    return positions
+
+
+def grid(count: int, center: Vector, size: Vector) -> array:
+    """ Square grid of count points on the XZ plane, filled row by row and spanning size. """
+    columns = max(1, ceil(sqrt(count)))
+    rows = max(1, ceil(count / columns))
+    step_x = size[0] / (columns - 1) if columns > 1 else 0.0
+    step_z = size[2] / (rows - 1) if rows > 1 else 0.0
+    start_x = center[0] - step_x * (columns - 1) * 0.5
+    start_z = center[2] - step_z * (rows - 1) * 0.5
+
+    return interleave([start_x + (index % columns) * step_x for index in range(count)],
+                      [center[1]] * count,
+                      [start_z + (index // columns) * step_z for index in range(count)])
+
+
+def line(count: int, center: Vector, size: Vector) -> array:
+    """ Count points evenly spaced along size, centered on center. """
+    steps = [index / (count - 1) - 0.5 for index in range(count)] if count > 1 else [0.0] * count
+    return interleave(*([c + t * s for t in steps] for c, s in zip(center, size)))
+
+
+def random_box(count: int, center: Vector, size: Vector, seed: int) -> array:
+    """ Count points scattered uniformly inside of a box, the same seed gives the same points. """
+    rng = random.Random(seed)
+    return array("d", [c + (rng.random() - 0.5) * s for _ in range(count) for c, s in zip(center, size)])
+
+
+def generate(pattern: int, count: int, center: Vector, size: Vector, seed: int = 0) -> array:
+    if pattern == LINE:
+        return line(count, center, size)
+    if pattern == RANDOM:
+        return random_box(count, center, size, seed)
+    return grid(count, center, size)
+
+
+class PatternCache(object):
+    """ Patterns by their inputs, so evaluating again with the same channel values reuses the positions. The oldest
+    entries are dropped once there are more than size of them. The arrays returned are shared and must not be
+    changed. """
+    def __init__(self, size: int = 16):
+        self.size = size
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, pattern: int, count: int, center: Vector, size: Vector, seed: int = 0) -> array:
+        key = (pattern, count, tuple(center), tuple(size), seed)
+        positions = self.entries.get(key)
+        if positions is not None:
+            self.hits += 1
+            return positions
+
+        self.misses += 1
+        positions = generate(pattern, count, center, size, seed)
+        self.entries[key] = positions
+        while len(self.entries) > self.size:
+            del self.entries[next(iter(self.entries))]
+        return positions
+
+
+pattern_cache = PatternCache()
@@ -0,0 +1,117 @@
+"""
+
+    Helpers for picking a random subset of component indices without building index lists.
+
+    Nothing in here touches lx, so the same code can be used by the selection operation and by anything that wants
+    the same selection outside of a mesh evaluation.
+
+"""
+
+import random
+
+# Component types, used to offset the seed so points, edges and polygons don't share the same pattern.
+POINT, EDGE, POLYGON = 0, 1, 2
+
+
+class BitArray(object):
+    """ Fixed size set of indices stored as one bit per index, a 10M vertex mesh needs ~1.2MB. """
+    def __init__(self, count: int):
+        self.count = count
+        self.bits = bytearray((count + 7) >> 3)
+
+    def __contains__(self, index: int) -> bool:
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, index: int):
+        self.bits[index >> 3] |= 1 << (index & 7)
+
+    def invert(self):
+        """ Flip every bit, indices past count will be set as well but are never tested. """
+        self.bits = bytearray(self.bits.translate(bytes(255 - i for i in range(256))))
+
+
+def sample_bits(count: int, percent: float, rng=random) -> BitArray:
+    """ Select int(percent * count) indices out of count using Floyd's algorithm, only the chosen indices are visited
+    so there is no list of every index. When selecting more than half we sample the ones to leave out and invert. """
+    k = min(max(int(percent * count), 0), count)
+    invert = k > count // 2
+    if invert:
+        k = count - k
+
+    bits = BitArray(count)
+    for j in range(count - k, count):
+        t = rng.randrange(j + 1)
+        if t in bits:
+            bits.add(j)
+        else:
+            bits.add(t)
+
+    if invert:
+        bits.invert()
+
+    return bits
+
+
+def sample_seeded(count: int, percent: float, seed: int, component: int) -> BitArray:
+    """ Reproducible sample_bits for one component type. """
+    return sample_bits(count, percent, random.Random(seed * 3 + component))
+
+
+# Hashes are reduced to 32 bits and compared against percent scaled to this range.
+HASH_RANGE = 1 << 32
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def hash_index(seed: int, index: int) -> int:
+    """ Mix seed and index into a well distributed 32 bit value, using the finalizer from MurmurHash3. """
+    x = (seed * 0x9E3779B97F4A7C15 + index) & _MASK64
+    x ^= x >> 33
+    x = (x * 0xFF51AFD7ED558CCD) & _MASK64
+    x ^= x >> 33
+    x = (x * 0xC4CEB9FE1A85EC53) & _MASK64
+    x ^= x >> 33
+    return x & 0xFFFFFFFF
+
+
+def hash_threshold(percent: float) -> int:
+    """ Convert a percent to the threshold hash_index values are compared against. """
+    return int(min(max(percent, 0.0), 1.0) * HASH_RANGE)
+
+
+def hash_test(seed: int, index: int, threshold: int) -> bool:
+    """ Stateless membership test, the same seed and index will always give the same answer. """
+    return hash_index(seed, index) < threshold
+
+
+def every_nth(index: int, step: int, offset: int = 0) -> bool:
+    """ Pattern test selecting every step-th index starting at offset. """
+    return step > 0 and index >= offset and (index - offset) % step == 0
+
+
+def _lattice(seed: int, x: int, y: int, z: int) -> float:
+    """ Random value in 0..1 for a lattice corner. """
+    return hash_index(seed, ((x * 73856093) ^ (y * 19349663) ^ (z * 83492791)) & _MASK64) / HASH_RANGE
+
+
+def _smooth(t: float) -> float:
+    return t * t * (3.0 - 2.0 * t)
+
+
+def value_noise(position, scale: float, seed: int) -> float:
+    """ Smooth 3D value noise in 0..1, lattice values come from the same hash as the stateless selection. Scale is the
+    size of a lattice cell. """
+    x, y, z = (p / scale for p in position) if scale > 0.0 else position
+    ix, iy, iz = int(x // 1), int(y // 1), int(z // 1)
+    fx, fy, fz = _smooth(x - ix), _smooth(y - iy), _smooth(z - iz)
+
+    def lerp(a, b, t):
+        return a + (b - a) * t
+
+    x00 = lerp(_lattice(seed, ix, iy, iz), _lattice(seed, ix + 1, iy, iz), fx)
+    x10 = lerp(_lattice(seed, ix, iy + 1, iz), _lattice(seed, ix + 1, iy + 1, iz), fx)
+    x01 = lerp(_lattice(seed, ix, iy, iz + 1), _lattice(seed, ix + 1, iy, iz + 1), fx)
+    x11 = lerp(_lattice(seed, ix, iy + 1, iz + 1), _lattice(seed, ix + 1, iy + 1, iz + 1), fx)
+    return lerp(lerp(x00, x10, fy), lerp(x01, x11, fy), fz)
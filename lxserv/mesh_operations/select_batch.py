@@ -0,0 +1,149 @@
+"""
+
+    Command selecting a pattern of components across all active layers in one pass.
+
+    Companion to py.selops.random, the random modes use the same percent and seed as the selection operation so both
+    pick the same components. Instead of answering a callback per component the selection is written straight to the
+    mesh marks, one layer at a time.
+
+"""
+
+import time
+
+import lx
+import lxu.command
+
+from . import sampling
+
+
+SERVER_NAME = "py.selops.batch"
+
+MODE_RANDOM, MODE_STATELESS, MODE_NTH, MODE_NOISE = 0, 1, 2, 3
+
+
+class Component(object):
+    """ Wraps the accessor for one component type so the command can treat them all the same. """
+    def __init__(self, mesh: lx.object.Mesh, component: int):
+        self.mesh = mesh
+        self.component = component
+        self.point = mesh.PointAccessor()
+
+        if component == sampling.POINT:
+            self.accessor = self.point
+            self.count = mesh.PointCount()
+            self.edit = lx.symbol.f_MESHEDIT_POINTS
+        elif component == sampling.EDGE:
+            self.accessor = mesh.EdgeAccessor()
+            self.count = mesh.EdgeCount()
+            self.edit = lx.symbol.f_MESHEDIT_GEOMETRY
+        else:
+            self.accessor = mesh.PolygonAccessor()
+            self.count = mesh.PolygonCount()
+            self.edit = lx.symbol.f_MESHEDIT_POLYGONS
+
+    def position(self):
+        """ Position for the currently selected element, used by the noise pattern. """
+        if self.component == sampling.POINT:
+            return self.point.Pos()
+
+        if self.component == sampling.EDGE:
+            a, b = self.accessor.Endpoints()
+            self.point.Select(a)
+            pos_a = self.point.Pos()
+            self.point.Select(b)
+            pos_b = self.point.Pos()
+            return tuple((x + y) * 0.5 for x, y in zip(pos_a, pos_b))
+
+        return self.accessor.RepresentativePosition()
+
+
+class Command(lxu.command.BasicCommand):
+    """ Select a percent, every nth or a noise threshold of points, edges or polygons in all active layers. """
+    def __init__(self):
+        lxu.command.BasicCommand.__init__(self)
+        self.dyna_Add("mode", lx.symbol.sTYPE_INTEGER)
+        self.dyna_SetHint(0, ((MODE_RANDOM, "random"), (MODE_STATELESS, "stateless"), (MODE_NTH, "nth"),
+                              (MODE_NOISE, "noise")))
+        self.dyna_Add("type", lx.symbol.sTYPE_INTEGER)
+        self.dyna_SetHint(1, ((sampling.POINT, "point"), (sampling.EDGE, "edge"), (sampling.POLYGON, "polygon")))
+        self.dyna_Add("random", lx.symbol.sTYPE_PERCENT)
+        self.dyna_Add("seed", lx.symbol.sTYPE_INTEGER)
+        self.dyna_Add("step", lx.symbol.sTYPE_INTEGER)
+        self.dyna_Add("scale", lx.symbol.sTYPE_DISTANCE)
+
+        for index in range(2, 6):
+            self.basic_SetFlags(index, lx.symbol.fCMDARG_OPTIONAL)
+
+    def cmd_Flags(self):
+        return lx.symbol.fCMD_MODEL | lx.symbol.fCMD_UNDO
+
+    def cmd_DialogInit(self):
+        if not self.dyna_IsSet(2):
+            self.attr_SetFlt(2, 0.5)
+        if not self.dyna_IsSet(4):
+            self.attr_SetInt(4, 2)
+        if not self.dyna_IsSet(5):
+            self.attr_SetFlt(5, 1.0)
+
+    def pattern(self, component: Component):
+        """ Return a function taking an index and returning True if it should be selected. """
+        mode = self.dyna_Int(0, MODE_RANDOM)
+        percent = self.dyna_Float(2, 0.5)
+        seed = self.dyna_Int(3, 0)
+
+        if mode == MODE_STATELESS:
+            threshold = sampling.hash_threshold(percent)
+            return lambda index: sampling.hash_test(seed, index, threshold)
+
+        if mode == MODE_NTH:
+            step = self.dyna_Int(4, 2)
+            return lambda index: sampling.every_nth(index, step)
+
+        if mode == MODE_NOISE:
+            scale = self.dyna_Float(5, 1.0)
+            return lambda index: sampling.value_noise(component.position(), scale, seed) < percent
+
+        bits = sampling.sample_seeded(component.count, percent, seed, component.component)
+        return bits.__contains__
+
+    def basic_Execute(self, msg, flags):
+        """ For each active layer, set the select mark on every component the pattern picks and clear it from the rest,
+        then apply all layers at once. """
+        mesh_service = lx.service.Mesh()
+        select = mesh_service.ModeCompose("select", None)
+        deselect = mesh_service.ModeCompose(None, "select")
+
+        component_type = self.dyna_Int(1, sampling.POINT)
+
+        layer_service = lx.service.Layer()
+        layer_scan = layer_service.ScanAllocate(lx.symbol.f_LAYERSCAN_EDIT)
+        if not layer_scan.test():
+            return
+
+        for layer_index in range(layer_scan.Count()):
+            start = time.perf_counter()
+
+            mesh = layer_scan.MeshEdit(layer_index)
+            component = Component(mesh, component_type)
+            test = self.pattern(component)
+            accessor = component.accessor
+
+            selected = 0
+            for index in range(component.count):
+                accessor.SelectByIndex(index)
+                if test(index):
+                    accessor.SetMarks(select)
+                    selected += 1
+                else:
+                    accessor.SetMarks(deselect)
+
+            layer_scan.SetMeshChange(layer_index, component.edit)
+
+            name = layer_scan.MeshItem(layer_index).UniqueName()
+            elapsed = (time.perf_counter() - start) * 1000.0
+            lx.out(f"{SERVER_NAME} {name}: selected {selected} of {component.count} in {elapsed:.1f} ms")
+
+        layer_scan.Apply()
+
+
+lx.bless(Command, SERVER_NAME)
@@ -2,15 +2,18 @@
 
     Selection Operation to select a random percent of components.
 
-"""
+    By default the selected indices are sampled once per component type, with "stateless" enabled each component is
+    instead tested on its own by hashing its index with the seed. Both modes are reproducible for a given seed.
 
-import random
+"""
 
 import lx
 import lxu
 import lxu.attributes
 import lxifc
 
+from . import sampling
+
 
 class SelectionOperation(lxifc.SelectionOperation, lxu.attributes.DynamicAttributes):
     def __init__(self):
@@ -19,47 +22,88 @@ class SelectionOperation(lxifc.SelectionOperation, lxu.attributes.DynamicAttribu
 
         self.dyna_Add("random", lx.symbol.sTYPE_PERCENT)
         self.attr_SetFlt(0, 0.5)
+        self.dyna_Add("seed", lx.symbol.sTYPE_INTEGER)
+        self.attr_SetInt(1, 0)
+        self.dyna_Add("stateless", lx.symbol.sTYPE_BOOLEAN)
+        self.attr_SetInt(2, 0)
 
         self.mesh = lx.object.Mesh()
         self.point = lx.object.Point()
         self.edge = lx.object.Edge()
         self.polygon = lx.object.Polygon()
 
-        # Keep sets for indices for each type of component
-        self.points = set()
-        self.edges = set()
-        self.polygons = set()
+        # Bits for selected indices of each type of component, only built once that type gets tested
+        self.percent = 0.5
+        self.constant = None  # set to True or False when percent selects everything or nothing
+        self.seed = 0
+        self.stateless = False
+        self.threshold = sampling.hash_threshold(self.percent)
+        self.points = None
+        self.edges = None
+        self.polygons = None
 
     def selop_SetMesh(self, mesh):
         """ Get's called whenever item get channel changes,"""
 
         # Check the % from input,
-        percent = self.dyna_Float(0, 0.5)
+        self.percent = self.dyna_Float(0, 0.5)
+        self.seed = self.dyna_Int(1, 0)
+        self.stateless = bool(self.dyna_Int(2, 0))
+        self.threshold = sampling.hash_threshold(self.percent)
+
+        # At 0% or 100% the answer doesn't depend on the component, so the tests can skip the accessors entirely.
+        if self.percent <= 0.0:
+            self.constant = False
+        elif self.percent >= 1.0:
+            self.constant = True
+        else:
+            self.constant = None
 
         if self.mesh.set(mesh):
-            # If we got a valid mesh, populate all sets and return OK
-            points, edges, polygons = self.mesh.PointCount(), self.mesh.EdgeCount(), self.mesh.PolygonCount()
-            self.points = set(random.sample([i for i in range(points)], k=int(percent * points)))
-            self.edges = set(random.sample([i for i in range(edges)], k=int(percent * edges)))
-            self.polygons = set(random.sample([i for i in range(polygons)], k=int(percent * polygons)))
+            # Bind the accessors once here rather than for every tested component,
+            self.point = self.mesh.PointAccessor()
+            self.edge = self.mesh.EdgeAccessor()
+            self.polygon = self.mesh.PolygonAccessor()
+
+            # If we got a valid mesh, drop the old selections and let the tests sample the type they need on demand,
+            # in stateless mode these are never built.
+            self.points = None
+            self.edges = None
+            self.polygons = None
             return lx.result.OK
 
         return lx.result.FAILED
 
     # Perform tests for each component, if they return true - that component will be selected by the selop
     def selop_TestPoint(self, point):
-        self.point.set(self.mesh.PointAccessor())
+        if self.constant is not None:
+            return self.constant
         self.point.Select(point)
+        if self.stateless:
+            return sampling.hash_test(self.seed, self.point.Index(), self.threshold)
+        if self.points is None:
+            self.points = sampling.sample_seeded(self.mesh.PointCount(), self.percent, self.seed, sampling.POINT)
         return self.point.Index() in self.points
 
     def selop_TestEdge(self, edge):
-        self.edge.set(self.mesh.EdgeAccessor())
+        if self.constant is not None:
+            return self.constant
         self.edge.Select(edge)
+        if self.stateless:
+            return sampling.hash_test(self.seed, self.edge.Index(), self.threshold)
+        if self.edges is None:
+            self.edges = sampling.sample_seeded(self.mesh.EdgeCount(), self.percent, self.seed, sampling.EDGE)
         return self.edge.Index() in self.edges
 
     def selop_TestPolygon(self, polygon):
-        self.polygon.set(self.mesh.PolygonAccessor())
+        if self.constant is not None:
+            return self.constant
         self.polygon.Select(polygon)
+        if self.stateless:
+            return sampling.hash_test(self.seed, self.polygon.Index(), self.threshold)
+        if self.polygons is None:
+            count = self.mesh.PolygonCount()
+            self.polygons = sampling.sample_seeded(count, self.percent, self.seed, sampling.POLYGON)
         return self.polygon.Index() in self.polygons
 
 
@@ -0,0 +1,71 @@
+"""
+
+    Table driven ChannelUI for packages where channels are enabled by boolean toggle channels.
+
+    The property panel asks for dependencies and enable states all the time, so the answers come straight out of a
+    table built once when the module is loaded. A package lists which toggles each channel depends on, and inherits
+    the ChannelUI methods from TableChannelUI,
+
+        class Package(lxifc.Package, TableChannelUI):
+            channel_dependencies = DependencyTable({
+                "border": ((lx.symbol.sITYPE_CAMERA, "borderOn"),),
+            })
+
+"""
+
+from typing import Dict, Sequence, Tuple
+
+import lx
+import lxifc
+
+
+Dependency = Tuple[str, str]  # item type name, channel name
+
+
+class DependencyTable(object):
+    """ Channel name to the toggle channels it depends on, a channel is enabled when all of its toggles are on. """
+    def __init__(self, dependencies: Dict[str, Sequence[Dependency]]):
+        self.dependencies = {name: tuple(depends) for name, depends in dependencies.items()}
+        self.counts = {name: len(depends) for name, depends in self.dependencies.items()}
+
+    def count(self, channel_name: str) -> int:
+        return self.counts.get(channel_name, 0)
+
+    def dependency(self, channel_name: str, index: int) -> Dependency:
+        return self.dependencies[channel_name][index]
+
+    def toggles(self, channel_name: str) -> Tuple[Dependency, ...]:
+        return self.dependencies.get(channel_name, ())
+
+
+class TableChannelUI(lxifc.ChannelUI):
+    """ ChannelUI answering from channel_dependencies, set it on the class using this. """
+    channel_dependencies = DependencyTable({})
+    disabled_message = "Turned off."
+
+    def cui_Enabled(self, channel_name: str, msg: lx.object.Unknown, item: lx.object.Unknown,
+                    channel_read: lx.object.Unknown) -> int:
+        """ Return lx.result.OK if every toggle the channel depends on is on, otherwise lx.result.CMD_DISABLED with a
+        message saying why. """
+        toggles = self.channel_dependencies.toggles(channel_name)
+        if not toggles:
+            return lx.result.OK
+
+        i = lx.object.Item(item)
+        cr = lx.object.ChannelRead(channel_read)
+        if all(cr.Integer(i, i.ChannelLookup(name)) for _, name in toggles):
+            return lx.result.OK
+
+        message = lx.object.Message(msg)
+        if message.test():
+            message.SetCode(lx.result.CMD_DISABLED)
+            message.SetMessage("common", "", 99)
+            message.SetArgumentString(1, self.disabled_message)
+
+        return lx.result.CMD_DISABLED
+
+    def cui_DependencyCount(self, channel_name: str) -> int:
+        return self.channel_dependencies.count(channel_name)
+
+    def cui_DependencyByIndexName(self, channel_name: str, index: int) -> Tuple[str, str]:
+        return self.channel_dependencies.dependency(channel_name, index)
@@ -1,7 +1,10 @@
+from __future__ import annotations
+
 import lx
 
+from array import array
 from enum import Enum
-from typing import Tuple
+from typing import Dict, Iterable, Sequence, Tuple
 
 
 class CameraFilmfit(Enum):
@@ -11,6 +14,66 @@ class CameraFilmfit(Enum):
     OVERSCAN = 3
 
 
+# Channels read from the camera, in the order they are read
+CAMERA_DOUBLES = (
+    lx.symbol.sICHAN_CAMERA_APERTUREX,
+    lx.symbol.sICHAN_CAMERA_APERTUREY,
+    lx.symbol.sICHAN_CAMERA_FOCALLEN,
+    lx.symbol.sICHAN_CAMERA_FOCUSDIST,
+    lx.symbol.sICHAN_CAMERA_FSTOP,
+    lx.symbol.sICHAN_CAMERA_IODIST,
+    lx.symbol.sICHAN_CAMERA_CONVDIST,
+    lx.symbol.sICHAN_CAMERA_OFFSETX,
+    lx.symbol.sICHAN_CAMERA_OFFSETY,
+    lx.symbol.sICHAN_CAMERA_TARGET,
+)
+CAMERA_INTEGERS = (
+    lx.symbol.sICHAN_CAMERA_FILMFIT,
+    lx.symbol.sICHAN_CAMERA_PROJTYPE,
+    lx.symbol.sICHAN_CAMERA_RESOVERRIDE,
+    lx.symbol.sICHAN_CAMERA_RESX,
+    lx.symbol.sICHAN_CAMERA_RESY,
+)
+CAMERA_OBJECTS = (
+    lx.symbol.sICHAN_XFRMCORE_WORLDMATRIX,
+)
+RENDERER_CHANNELS = (
+    lx.symbol.sICHAN_POLYRENDER_RESX,
+    lx.symbol.sICHAN_POLYRENDER_RESY,
+    lx.symbol.sICHAN_POLYRENDER_PASPECT,
+)
+
+IDENTITY = ((1.0, 0.0, 0.0, 0.0), (0.0, 1.0, 0.0, 0.0), (0.0, 0.0, 1.0, 0.0), (0.0, 0.0, 0.0, 1.0))
+
+channel_indices = {}  # type: Dict[int, Dict[str, int]]  # item type -> channel name -> channel index
+camera_infos = {}  # type: Dict[str, CameraInfo]  # camera ident -> info from the last CameraInfo.cached call
+
+
+def lookup_channels(item: lx.object.Item, names: Iterable[str]) -> Dict[str, int]:
+    """ Channel indices are the same for every item of a type, so look each name up once per type. """
+    indices = channel_indices.setdefault(item.Type(), {})
+    for name in names:
+        if name not in indices:
+            indices[name] = item.ChannelLookup(name)
+    return indices
+
+
+def transform(rows, positions: Sequence[float]) -> Tuple[Sequence[float], Sequence[float], Sequence[float]]:
+    """ Multiply a flat array of positions (x, y, z, x, y, z, ...) by the rows of a matrix, the same way
+    Matrix.MultiplyVector does with the offset in the last row, returning one sequence per axis. """
+    xs, ys, zs = positions[0::3], positions[1::3], positions[2::3]
+    if rows == IDENTITY:
+        return xs, ys, zs
+
+    (a, b, c, _), (d, e, f, _), (g, h, i, _), (tx, ty, tz, _) = rows
+    if not (b or c or d or f or g or h):  # only scale and translation, each axis on its own
+        return [x * a + tx for x in xs], [y * e + ty for y in ys], [z * i + tz for z in zs]
+
+    return ([x * a + y * d + z * g + tx for x, y, z in zip(xs, ys, zs)],
+            [x * b + y * e + z * h + ty for x, y, z in zip(xs, ys, zs)],
+            [x * c + y * f + z * i + tz for x, y, z in zip(xs, ys, zs)])
+
+
 class CameraInfo(object):
     def __init__(self, camera: lx.object.Item):
         self.valid = False
@@ -56,10 +119,34 @@ class CameraInfo(object):
         self.xfrm_inverse = lx.object.Matrix(value_service.CreateValue(lx.symbol.sTYPE_MATRIX4))
         self.xfrm_inverse.SetIdentity()
 
+        # Plain copies of the matrices for projecting many points at once
+        self.rows = IDENTITY
+        self.inverse_rows = IDENTITY
+
+        # Zooms and the inputs they were computed from, see get_zooms
+        self.zooms = (1.0, 1.0)
+        self.zooms_key = None
+
         self.camera = camera
 
-    def read_camera_channels(self, chan: lx.object.ChannelRead):
-        """ Read channels from camera item """
+        # Everything read from the channels last time, to tell if anything changed since
+        self.signature = None
+
+    @classmethod
+    def cached(cls, camera: lx.object.Item, chan: lx.object.ChannelRead) -> CameraInfo:
+        """ Get the camera info for a camera, reusing the one from the previous call for the same camera when none of
+        its channels have changed. """
+        ident = camera.Ident()
+        info = camera_infos.get(ident)
+        if info is None:
+            info = camera_infos[ident] = cls(camera)
+        info.camera = camera
+        info.read_camera_channels(chan)
+        return info
+
+    def read_camera_channels(self, chan: lx.object.ChannelRead) -> bool:
+        """ Read channels from camera item, returns False when nothing changed since the last read, in which case the
+        values already stored are kept as they are. """
 
         """ To get a channel read, we can get the context from the camera to get the scene,
         then from scene create the channel reader like this
@@ -70,77 +157,101 @@ class CameraInfo(object):
         
         """
 
-        self.aperture_x = chan.Double(self.camera, self.camera.ChannelLookup(lx.symbol.sICHAN_CAMERA_APERTUREX))
-        self.aperture_y = chan.Double(self.camera, self.camera.ChannelLookup(lx.symbol.sICHAN_CAMERA_APERTUREY))
+        camera = self.camera
+        indices = lookup_channels(camera, CAMERA_DOUBLES + CAMERA_INTEGERS + CAMERA_OBJECTS)
+        doubles = tuple(chan.Double(camera, indices[name]) for name in CAMERA_DOUBLES)
+        integers = tuple(chan.Integer(camera, indices[name]) for name in CAMERA_INTEGERS)
+
+        # Get the resolution, either from camera override or the renderer in the scene.
+        renderer_values = ()
+        resolution_override = integers[2]
+        if not resolution_override:
+            renderer = camera.Context().AnyItemOfType(lx.symbol.sITYPE_POLYRENDER)
+            renderer_indices = lookup_channels(renderer, RENDERER_CHANNELS)
+            renderer_values = (
+                chan.Integer(renderer, renderer_indices[lx.symbol.sICHAN_POLYRENDER_RESX]),
+                chan.Integer(renderer, renderer_indices[lx.symbol.sICHAN_POLYRENDER_RESY]),
+                chan.Double(renderer, renderer_indices[lx.symbol.sICHAN_POLYRENDER_PASPECT]),
+            )
 
-        self.focal_length = chan.Double(self.camera, self.camera.ChannelLookup(lx.symbol.sICHAN_CAMERA_FOCALLEN))
-        self.focus_distance = chan.Double(self.camera, self.camera.ChannelLookup(lx.symbol.sICHAN_CAMERA_FOCUSDIST))
-        self.fstop = chan.Double(self.camera, self.camera.ChannelLookup(lx.symbol.sICHAN_CAMERA_FSTOP))
+        # Get the world transform for the camera,
+        _obj = chan.ValueObj(camera, indices[lx.symbol.sICHAN_XFRMCORE_WORLDMATRIX])
+        _matrix = lx.object.Matrix(_obj)  # the matrix read from channels are Read Only, in effect
+        matrix = _matrix.Get4()
 
-        self.eye_separation = chan.Double(self.camera, self.camera.ChannelLookup(lx.symbol.sICHAN_CAMERA_IODIST))
-        self.convergence_distance = chan.Double(self.camera, self.camera.ChannelLookup(lx.symbol.sICHAN_CAMERA_CONVDIST))
+        # If nothing changed since the last read, keep everything as it is and skip the copying and inverting
+        signature = (doubles, integers, renderer_values, matrix)
+        if self.valid and signature == self.signature:
+            return False
+        self.signature = signature
 
-        self.film_fit = chan.Integer(self.camera, self.camera.ChannelLookup(lx.symbol.sICHAN_CAMERA_FILMFIT))
-        self.projection_type = chan.Integer(self.camera, self.camera.ChannelLookup(lx.symbol.sICHAN_CAMERA_PROJTYPE))
-        self.offset_x = chan.Double(self.camera, self.camera.ChannelLookup(lx.symbol.sICHAN_CAMERA_OFFSETX))
-        self.offset_y = chan.Double(self.camera, self.camera.ChannelLookup(lx.symbol.sICHAN_CAMERA_OFFSETY))
-        self.target_distance = chan.Double(self.camera, self.camera.ChannelLookup(lx.symbol.sICHAN_CAMERA_TARGET))
+        (self.aperture_x, self.aperture_y, self.focal_length, self.focus_distance, self.fstop, self.eye_separation,
+         self.convergence_distance, self.offset_x, self.offset_y, self.target_distance) = doubles
+        self.film_fit, self.projection_type = integers[0], integers[1]
 
-        # Get the resolution, either from camera override or the renderer in the scene.
         self.pixel_aspect = 1.0
-        resolution_override = chan.Integer(self.camera, self.camera.ChannelLookup(lx.symbol.sICHAN_CAMERA_RESOVERRIDE))
         if resolution_override:
-            self.render_x = chan.Integer(self.camera, self.camera.ChannelLookup(lx.symbol.sICHAN_CAMERA_RESX))
-            self.render_y = chan.Integer(self.camera, self.camera.ChannelLookup(lx.symbol.sICHAN_CAMERA_RESY))
+            self.render_x, self.render_y = integers[3], integers[4]
         else:
-            scene = self.camera.Context()
-            renderer = scene.AnyItemOfType(lx.symbol.sITYPE_POLYRENDER)
-            self.render_x = chan.Integer(renderer, renderer.ChannelLookup(lx.symbol.sICHAN_POLYRENDER_RESX))
-            self.render_y = chan.Integer(renderer, renderer.ChannelLookup(lx.symbol.sICHAN_POLYRENDER_RESY))
-            self.pixel_aspect = chan.Double(renderer, renderer.ChannelLookup(lx.symbol.sICHAN_POLYRENDER_PASPECT))
+            self.render_x, self.render_y, self.pixel_aspect = renderer_values
 
-        # Get the world transform for the camera,
-        _obj = chan.ValueObj(self.camera, self.camera.ChannelLookup(lx.symbol.sICHAN_XFRMCORE_WORLDMATRIX))
-        _matrix = lx.object.Matrix(_obj)  # the matrix read from channels are Read Only, in effect
-        self.xfrm.Set4(_matrix.Get4())  # copy over the values to our property
+        self.xfrm.Set4(matrix)  # copy over the values to our property
 
         self.position.set(_matrix.GetOffset())
 
         # copy and invert the world transform matrix,
-        self.xfrm_inverse.Set4(_matrix.Get4())
+        self.xfrm_inverse.Set4(matrix)
         self.xfrm_inverse.Invert()
 
+        self.rows = tuple(tuple(row) for row in matrix)
+        self.inverse_rows = tuple(tuple(row) for row in self.xfrm_inverse.Get4())
+
         # If we made it all the way here, set the instance to valid,
         self.valid = True
+        return True
 
-    def fit_aperture(self):
-        """ Compute the effective aperture given image resolution and film fit modes """
+    def fitted_aperture(self) -> Tuple[float, float]:
+        """ Compute the effective aperture given image resolution and film fit modes, without changing the apertures
+        read from the camera. """
+        aperture_x, aperture_y = self.aperture_x, self.aperture_y
 
-        camera_aspect_ratio = self.aperture_x / self.aperture_y
+        camera_aspect_ratio = aperture_x / aperture_y
         film_aspect_ratio = self.pixel_aspect * self.render_x / self.render_y
 
-        # TODO: sort out this mess, could likely be written more clearly
+        # Fill and vertical keep the aperture inside of the film, horizontal and overscan grow it to cover the film
+        film_fit = CameraFilmfit(self.film_fit)
+        fit_inside = film_fit in (CameraFilmfit.FILL, CameraFilmfit.VERTICAL)
+
         if camera_aspect_ratio > film_aspect_ratio:
-            if self.film_fit in (CameraFilmfit.FILL, CameraFilmfit.VERTICAL):
-                self.aperture_x *= film_aspect_ratio / camera_aspect_ratio
-            elif self.film_fit in (CameraFilmfit.HORIZONTAL, CameraFilmfit.OVERSCAN):
-                self.aperture_y *= camera_aspect_ratio / film_aspect_ratio
+            if fit_inside:
+                aperture_x *= film_aspect_ratio / camera_aspect_ratio
+            else:
+                aperture_y *= camera_aspect_ratio / film_aspect_ratio
 
         elif film_aspect_ratio > camera_aspect_ratio:
-            if self.film_fit in (CameraFilmfit.FILL, CameraFilmfit.VERTICAL):
-                self.aperture_y *= camera_aspect_ratio / film_aspect_ratio
-            elif self.film_fit in (CameraFilmfit.HORIZONTAL, CameraFilmfit.OVERSCAN):
-                self.aperture_x *= film_aspect_ratio / camera_aspect_ratio
+            if fit_inside:
+                aperture_y *= camera_aspect_ratio / film_aspect_ratio
+            else:
+                aperture_x *= film_aspect_ratio / camera_aspect_ratio
+
+        return aperture_x, aperture_y
 
     def get_zooms(self) -> Tuple[float, float]:
-        if not self.use_sensor:
-            self.fit_aperture()
+        """ Zooms for the fitted aperture, only computed again when any of the values they depend on changed. """
+        key = (self.aperture_x, self.aperture_y, self.pixel_aspect, self.render_x, self.render_y, self.film_fit,
+               self.focal_length, self.use_sensor)
+        if key == self.zooms_key:
+            return self.zooms
+
+        aperture_x, aperture_y = (self.aperture_x, self.aperture_y) if self.use_sensor else self.fitted_aperture()
 
         zoom_x = 0.5 / self.focal_length
-        zoom_y = zoom_x * self.aperture_y
-        zoom_x *= self.aperture_x
+        zoom_y = zoom_x * aperture_y
+        zoom_x *= aperture_x
 
-        return zoom_x, zoom_y
+        self.zooms = zoom_x, zoom_y
+        self.zooms_key = key
+        return self.zooms
 
     def uv_to_cam3D(self, uv: Tuple[float, float], z: float) -> Tuple[float, float, float]:
         """ Find the 3D position in camera coordinates at depth z, of a spot in the camera view/render"""
@@ -166,7 +277,8 @@ class CameraInfo(object):
         u = (u + 1.0) / 2.0
         v = (v + 1.0) / 2.0
 
-        if not 0.0 <= u <= 1.0 and 0.0 <= v <= 1.0 and 0.0 <= position[2]:
+        # cameras look down their negative z axis, so anything visible is in front of that
+        if not (0.0 <= u <= 1.0 and 0.0 <= v <= 1.0 and position[2] < 0.0):
             raise RuntimeError("Position is not inside of camera frustum")
 
         return u, v
@@ -180,3 +292,35 @@ class CameraInfo(object):
         """ compute 3D position of screen spot at given depth """
         cpos = self.uv_to_cam3D(uv, z)
         return self.xfrm.MultiplyVector(cpos)
+
+    def world_to_uv_many(self, positions: Sequence[float]) -> Tuple[array, array, bytearray]:
+        """ Project a flat array of world positions (x, y, z, x, y, z, ...) in one go, returning the u and v of every
+        position and a mask which is 1 for the positions inside of the camera frustum. Positions at the camera's depth
+        land in the center of the view and are masked out rather than raising. """
+        zoom_x, zoom_y = self.get_zooms()
+        xs, ys, zs = transform(self.inverse_rows, positions)
+
+        # scale to 0..1 range in one multiply, u = (x / (zoom_x * |z|) + 1) / 2
+        depths = [abs(z) or float("inf") for z in zs]
+        half_x, half_y = 0.5 / zoom_x, 0.5 / zoom_y
+        us = array("d", [x * half_x / d + 0.5 for x, d in zip(xs, depths)])
+        vs = array("d", [y * half_y / d + 0.5 for y, d in zip(ys, depths)])
+
+        visible = bytearray(0.0 <= u <= 1.0 and 0.0 <= v <= 1.0 and z < 0.0 for u, v, z in zip(us, vs, zs))
+        return us, vs, visible
+
+    def uv_to_world_many(self, uvs: Sequence[float], z: float) -> array:
+        """ Positions in world space at depth z, for a flat array of uv coordinates (u, v, u, v, ...), returned as a
+        flat array of positions. """
+        zoom_x, zoom_y = self.get_zooms()
+        scale_x, scale_y = 2.0 * abs(z) * zoom_x, 2.0 * abs(z) * zoom_y
+        offset_x, offset_y = -abs(z) * zoom_x, -abs(z) * zoom_y
+
+        camera_positions = array("d", [z]) * (len(uvs) // 2 * 3)
+        camera_positions[0::3] = array("d", [u * scale_x + offset_x for u in uvs[0::2]])
+        camera_positions[1::3] = array("d", [v * scale_y + offset_y for v in uvs[1::2]])
+
+        positions = array("d", bytes(len(camera_positions) * 8))
+        positions[0::3], positions[1::3], positions[2::3] = (
+            array("d", axis) for axis in transform(self.rows, camera_positions))
+        return positions
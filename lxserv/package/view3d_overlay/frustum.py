@@ -0,0 +1,105 @@
+"""
+
+    Frustum culling for overlays, telling which of many bounding boxes are inside, partially inside or outside of what
+    a camera sees.
+
+    The planes are computed once from a CameraInfo and moved into world space, so testing a box is just a dot product
+    per plane with no matrix multiplies. Boxes are given as a flat array of doubles, six per box in the order
+    (min x, min y, min z, max x, max y, max z), and tested plane by plane over all boxes at once.
+
+    Only the perspective projection is handled, same as the projections in CameraInfo.
+
+"""
+
+from typing import Dict, Sequence, Tuple
+
+from .camera_info import CameraInfo
+
+
+OUTSIDE, PARTIAL, INSIDE = 0, 1, 2
+
+NEAR = 0.001  # default near clip distance, everything closer than this to the camera is culled
+
+Plane = Tuple[float, float, float, float]  # a, b, c, d where a*x + b*y + c*z + d >= 0 is inside
+
+
+def to_world(plane: Plane, inverse_rows) -> Plane:
+    """ Move a plane from camera space to world space, given the rows of the inverse camera transform. """
+    a, b, c, d = plane
+    (r00, r01, r02, _), (r10, r11, r12, _), (r20, r21, r22, _), (tx, ty, tz, _) = inverse_rows
+    return (r00 * a + r01 * b + r02 * c,
+            r10 * a + r11 * b + r12 * c,
+            r20 * a + r21 * b + r22 * c,
+            tx * a + ty * b + tz * c + d)
+
+
+class Frustum(object):
+    def __init__(self, planes: Sequence[Plane]):
+        self.planes = tuple(planes)
+        self.extents = tuple((abs(a), abs(b), abs(c)) for a, b, c, _ in self.planes)
+
+    @classmethod
+    def from_camera(cls, info: CameraInfo, near: float = NEAR, far: float = None) -> "Frustum":
+        """ Build the frustum for the camera, which looks down its negative z axis. """
+        zoom_x, zoom_y = info.get_zooms()
+        planes = [
+            (1.0, 0.0, -zoom_x, 0.0),  # left, x >= -zoom_x * depth
+            (-1.0, 0.0, -zoom_x, 0.0),  # right
+            (0.0, 1.0, -zoom_y, 0.0),  # bottom
+            (0.0, -1.0, -zoom_y, 0.0),  # top
+            (0.0, 0.0, -1.0, -near),  # near, depth >= near
+        ]
+        if far is not None:
+            planes.append((0.0, 0.0, 1.0, far))
+
+        return cls(to_world(plane, info.inverse_rows) for plane in planes)
+
+    def test_point(self, position: Tuple[float, float, float]) -> bool:
+        x, y, z = position
+        return all(a * x + b * y + c * z + d >= 0.0 for a, b, c, d in self.planes)
+
+    def test_box(self, minimum: Tuple[float, float, float], maximum: Tuple[float, float, float]) -> int:
+        """ Test a single box, returning OUTSIDE, PARTIAL or INSIDE. """
+        return self.test_boxes(tuple(minimum) + tuple(maximum))[0]
+
+    def test_boxes(self, boxes: Sequence[float]) -> bytearray:
+        """ Test a flat array of boxes, returning OUTSIDE, PARTIAL or INSIDE for each box. """
+        min_x, min_y, min_z = boxes[0::6], boxes[1::6], boxes[2::6]
+        max_x, max_y, max_z = boxes[3::6], boxes[4::6], boxes[5::6]
+
+        # A box is a center and a half size, for each plane the distance of the center and how far the box reaches
+        # towards the plane decides if it is all on one side or crossing it
+        xs = [(low + high) * 0.5 for low, high in zip(min_x, max_x)]
+        ys = [(low + high) * 0.5 for low, high in zip(min_y, max_y)]
+        zs = [(low + high) * 0.5 for low, high in zip(min_z, max_z)]
+        hxs = [(high - low) * 0.5 for low, high in zip(min_x, max_x)]
+        hys = [(high - low) * 0.5 for low, high in zip(min_y, max_y)]
+        hzs = [(high - low) * 0.5 for low, high in zip(min_z, max_z)]
+
+        states = [INSIDE] * len(xs)
+        for (a, b, c, d), (ea, eb, ec) in zip(self.planes, self.extents):
+            states = [
+                OUTSIDE if state == OUTSIDE or distance < -reach else PARTIAL if distance < reach else state
+                for state, distance, reach in zip(
+                    states,
+                    [a * x + b * y + c * z + d for x, y, z in zip(xs, ys, zs)],
+                    [ea * hx + eb * hy + ec * hz for hx, hy, hz in zip(hxs, hys, hzs)])
+            ]
+
+        return bytearray(states)
+
+
+frustums = {}  # type: Dict[str, Tuple[tuple, Frustum]]  # camera ident -> (key, frustum built at key)
+
+
+def camera_frustum(info: CameraInfo, near: float = NEAR, far: float = None) -> Frustum:
+    """ Frustum for a camera, only built again when the camera has changed since the last call. """
+    key = (info.signature, info.get_zooms(), near, far)
+    ident = info.camera.Ident()
+    entry = frustums.get(ident)
+    if entry is not None and entry[0] == key:
+        return entry[1]
+
+    frustum = Frustum.from_camera(info, near, far)
+    frustums[ident] = (key, frustum)
+    return frustum
@@ -1,9 +1,12 @@
+from array import array
 from dataclasses import dataclass
-from typing import Tuple
+from math import atan2, cos, exp, pi, sin
+from typing import List, Tuple
 
 import lx
 import lxifc
 
+from ..channel_ui import DependencyTable, TableChannelUI
 from .camera_info import CameraInfo
 
 
@@ -15,12 +18,84 @@ SPIRAL_B = 0.306349
 SPIRAL_CX = 1.17082  # (2PHI+1)/(PHI+2)
 SPIRAL_CY = 0.276393  # -1/(PHI+2)
 
+SPIRAL_TURNS = 4
+SPIRAL_STEPS = 32  # line segments per quarter turn
+
+DEPTH = -1.0  # distance in front of the camera the overlay is drawn at, cameras look down negative z
+
+ACTION_COLOR = (0.8, 0.0, 0.8)
+TITLE_COLOR = (0.0, 0.8, 0.8)
+GOLDEN_COLOR = (0.8, 0.6, 0.0)
+
+# Channels on the overlay read each draw, in the order of the settings tuple, and whether they are booleans
+SETTINGS_CHANNELS = (
+    ("actionOn", True),
+    ("actHBorder", False),
+    ("actVBorder", False),
+    ("titleOn", True),
+    ("titHBorder", False),
+    ("titVBorder", False),
+    ("goldenOn", True),
+)
+
+Stroke = Tuple[int, Tuple[float, float, float], array]  # stroke type, color and a flat array of u, v coordinates
+
 
 @dataclass
 class Rectangle:
     position: tuple = (0.0, 0.0)
     size: tuple = (1.0, 1.77777)
 
+    def corners(self) -> array:
+        """ The four corners as u, v pairs, in order around the rectangle. """
+        (x, y), (w, h) = self.position, self.size
+        return array("d", (x, y, x + w, y, x + w, y + h, x, y + h))
+
+
+def inset(horizontal: float, vertical: float) -> Rectangle:
+    """ Rectangle inside of the frame, with borders given as a part of the full width and height. """
+    return Rectangle((horizontal, vertical), (1.0 - 2.0 * horizontal, 1.0 - 2.0 * vertical))
+
+
+def golden_guides() -> array:
+    """ Lines dividing the frame by the golden ratio, as pairs of u, v pairs. """
+    guides = array("d")
+    for split in (1.0 - ONE_OVER_PHI, ONE_OVER_PHI):
+        guides.extend((split, 0.0, split, 1.0))
+        guides.extend((0.0, split, 1.0, split))
+    return guides
+
+
+def golden_spiral() -> array:
+    """ Golden spiral starting in the lower left corner of a golden rectangle, squashed to fit the frame.
+
+    In a PHI by 1 rectangle the spiral is r = SPIRAL_A * e^(SPIRAL_B * (angle - pi)) around (SPIRAL_CX, SPIRAL_CY),
+    winding inwards clockwise through the corners of the ever smaller squares. """
+    start = atan2(-SPIRAL_CY, -SPIRAL_CX) % (2.0 * pi)
+    steps = SPIRAL_TURNS * 4 * SPIRAL_STEPS
+    step = 2.0 * pi * SPIRAL_TURNS / steps
+
+    spiral = array("d")
+    for index in range(steps + 1):
+        angle = start - index * step
+        radius = SPIRAL_A * exp(SPIRAL_B * (angle - pi))
+        spiral.extend(((SPIRAL_CX + radius * cos(angle)) / PHI, SPIRAL_CY + radius * sin(angle)))
+    return spiral
+
+
+def frame_strokes(settings: tuple) -> List[Stroke]:
+    """ Strokes for the overlay in u, v coordinates of the camera frame, for the channel values in settings. """
+    action_on, action_h, action_v, title_on, title_h, title_v, golden_on = settings
+    strokes = []
+    if action_on:
+        strokes.append((lx.symbol.iSTROKE_LINE_LOOP, ACTION_COLOR, inset(action_h, action_v).corners()))
+    if title_on:
+        strokes.append((lx.symbol.iSTROKE_LINE_LOOP, TITLE_COLOR, inset(title_h, title_v).corners()))
+    if golden_on:
+        strokes.append((lx.symbol.iSTROKE_LINES, GOLDEN_COLOR, golden_guides()))
+        strokes.append((lx.symbol.iSTROKE_LINE_STRIP, GOLDEN_COLOR, golden_spiral()))
+    return strokes
+
 
 class Instance(lxifc.PackageInstance, lxifc.ViewItem3D):
     """ The instance is the implementation of the item, and there will be one
@@ -32,6 +107,14 @@ class Instance(lxifc.PackageInstance, lxifc.ViewItem3D):
         self.camera_type = 0
         self.renderer_type = 0
 
+        self.channels = None  # (index, boolean) of the SETTINGS_CHANNELS on our item, looked up on the first draw
+
+        # Strokes in u, v for the last settings, and the same strokes in world space for the last camera
+        self.frame_key = None
+        self.frame = []
+        self.strokes_key = None
+        self.strokes = []
+
     def pins_Initialize(self, item, super):
         self.item = lx.object.Item(item)
 
@@ -61,24 +144,53 @@ class Instance(lxifc.PackageInstance, lxifc.ViewItem3D):
         if not camera.test():
             return
 
-        action_on = cr.Integer(self.item, self.item.ChannelLookup("actionOn"))
+        if self.channels is None:
+            self.channels = tuple((self.item.ChannelLookup(name), boolean) for name, boolean in SETTINGS_CHANNELS)
+        settings = tuple(cr.Integer(self.item, index) if boolean else cr.Double(self.item, index)
+                         for index, boolean in self.channels)
 
-        # TODO: these values should all come from reading channels,
-        rgb = (0.8, 0.0, 0.8)
+        info = CameraInfo.cached(camera, cr)
         alpha = 1.0
-
-        if action_on:
-            sd.Begin(lx.symbol.iSTROKE_TEXT, rgb, alpha)
-            sd.Text("Hello", lx.symbol.iTEXT_LEFT)
-            sd.Vertex((0.0, 0.0, 0.0), lx.symbol.iSTROKE_ABSOLUTE)
-
-
-class Package(lxifc.Package, lxifc.ChannelUI):
+        for stroke_type, rgb, vertices in self.world_strokes(info, settings):
+            sd.Begin(stroke_type, rgb, alpha)
+            for vertex in vertices:
+                sd.Vertex(vertex, lx.symbol.iSTROKE_ABSOLUTE)
+
+    def world_strokes(self, info: CameraInfo, settings: tuple) -> List[Tuple[int, tuple, list]]:
+        """ Strokes with world space vertices, only computed again when the settings or what the camera frames, its
+        zooms from the fitted aperture and resolution or its transform, has changed. """
+        if settings != self.frame_key:
+            self.frame = frame_strokes(settings)
+            self.frame_key = settings
+
+        key = (settings, info.get_zooms(), info.render_x, info.render_y, info.pixel_aspect, info.rows)
+        if key != self.strokes_key:
+            self.strokes = []
+            for stroke_type, rgb, uvs in self.frame:
+                positions = info.uv_to_world_many(uvs, DEPTH)
+                vertices = list(zip(positions[0::3], positions[1::3], positions[2::3]))
+                self.strokes.append((stroke_type, rgb, vertices))
+            self.strokes_key = key
+
+        return self.strokes
+
+
+class Package(lxifc.Package, TableChannelUI):
     """ Packages implement item types, or simple item extensions. They are
     like the metatype object for the item type. They define the common
     set of channels for the item type and spawn new instances.
 
+    The ChannelUI, enabling the border channels only while their overlay is
+    turned on, is served from the dependency table below.
+
     """
+    channel_dependencies = DependencyTable({
+        "actHBorder": ((lx.symbol.sITYPE_CAMERA, "actionOn"),),
+        "actVBorder": ((lx.symbol.sITYPE_CAMERA, "actionOn"),),
+        "titHBorder": ((lx.symbol.sITYPE_CAMERA, "titleOn"),),
+        "titVBorder": ((lx.symbol.sITYPE_CAMERA, "titleOn"),),
+    })
+
     def pkg_SetupChannels(self, add_channel):
         """ The package has a set of standard channels with default values. These
         are setup at the start using the AddChannel interface. """
@@ -90,6 +202,14 @@ class Package(lxifc.Package, lxifc.ChannelUI):
         ac.SetDefault(0.05, 0)
         ac.NewChannel("actVBorder", lx.symbol.sTYPE_PERCENT)  # border height as percent
         ac.SetDefault(0.05, 0)
+        ac.NewChannel("titleOn", lx.symbol.sTYPE_BOOLEAN)
+        ac.SetDefault(0.0, 0)
+        ac.NewChannel("titHBorder", lx.symbol.sTYPE_PERCENT)
+        ac.SetDefault(0.1, 0)
+        ac.NewChannel("titVBorder", lx.symbol.sTYPE_PERCENT)
+        ac.SetDefault(0.1, 0)
+        ac.NewChannel("goldenOn", lx.symbol.sTYPE_BOOLEAN)  # golden ratio guides and spiral
+        ac.SetDefault(0.0, 0)
 
     def pkg_Attach(self):
         """ Attach is called to create a new instance of this item. The returned
@@ -102,41 +222,6 @@ class Package(lxifc.Package, lxifc.ChannelUI):
         view3d = guid_service.Compare(guid, lx.symbol.u_VIEW3D)
         return package_instance == 0 or view3d == 0
 
-    def cui_Enabled(self, channel_name: str, msg: lx.object.Unknown, item: lx.object.Unknown, channel_read: lx.object.Unknown) -> int:
-        """ Much like commands, channels can be disabled through this method. Return lx.result.CMD_DISABLED for disabled
-        and lx.result.OK for enabled, any other result codes will be seen as a failure code. """
-
-        if channel_name in ("actHBorder", "actVBorder"):
-            i = lx.object.Item(item)
-            cr = lx.object.ChannelRead(channel_read)
-
-            actionOn = cr.Integer(i, i.ChannelLookup("actionOn"))
-            if actionOn == 1:
-                return lx.result.OK
-
-            message = lx.object.Message(msg)
-            if message.test():
-                message.SetCode(lx.result.CMD_DISABLED)
-                message.SetMessage("common", "", 99)
-                message.SetArgumentString(1, "Turned off.")
-
-            return lx.result.CMD_DISABLED
-
-    def cui_DependencyCount(self, channel_name: str) -> int:
-        """ Channels need to know what other channels this channel depends on to implement the cui_Enable, so we will
-        implement cui_DependencyCount and cui_DependencyByIndex to control the enable state. """
-        if channel_name in ("actHBorder", "actVBorder"):
-            print(channel_name)
-            return 1
-        else:
-            return 0
-
-    def cui_DependencyByIndexName(self, channel_name: str, index: int) -> Tuple[int, str]:
-        """ The SDK example was using DependencyByIndex, while the documentation does say this is the preferred method.
-        So I opted for using this one over that. """
-        if channel_name in ("actHBorder", "actVBorder"):
-            return lx.symbol.sITYPE_CAMERA, "actionOn"
-
 # tags = {lx.symbol.sPKG_SUPERTYPE: lx.symbol.sITYPE_LOCATOR}
 # currently we can't add it through "Add Item" but have to run
 # item.addPackage py.safeAreaOverlay on another item
@@ -0,0 +1,5 @@
+"""
+
+    Helpers shared by the sample packages, nothing in here registers a plug-in.
+
+"""
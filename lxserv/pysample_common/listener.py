@@ -0,0 +1,27 @@
+"""
+
+    Base class for listeners living as long as the session, such as caches that are kept up to date from scene events.
+
+"""
+
+import lx
+
+
+class Listener(object):
+    """ Adds itself to the listener service when created and removes itself when deleted. Subclasses also derive from
+    the lxifc listener interfaces they implement, and call Listener.__init__ once their own state is set up as events
+    can arrive as soon as it has been added.
+
+    Switching the current scene is an add to the scene selection, so scene_type is looked up for selection listeners
+    that have to tell.
+
+    """
+    def __init__(self):
+        self.scene_type = lx.service.Selection().LookupType(lx.symbol.sSELTYP_SCENE)
+
+        self.listener_service = lx.service.Listener()
+        self.COM_object = lx.object.Unknown(self)
+        self.listener_service.AddListener(self.COM_object)
+
+    def __del__(self):
+        self.listener_service.RemoveListener(self.COM_object)
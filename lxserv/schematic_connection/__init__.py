@@ -1,2 +1,3 @@
 from . import graph
 from . import modifier
+from . import link_stats
@@ -0,0 +1,233 @@
+"""
+
+    Modifier taking any number of linked items and writing statistics over all of their channels, the number of
+    channels, how many of them are integer, float, gradient or other types and how many are animated.
+
+    Like py.schema.modifier, but for auditing rigs, statistics for each linked item are computed in one pass over its
+    channels and cached. The cache listens to scene events, computing statistics when an item gets linked, and only
+    marks an item as dirty when its channels, packages or values change. Dirty items are computed again once the user
+    is idle, so dragging a linked control scans its channels once rather than on every edit, and the modifiers are
+    only invalidated when the numbers actually changed.
+
+"""
+
+from typing import Dict, List, NamedTuple, Tuple
+
+import lx
+import lxifc
+import lxu
+import lxu.meta
+import lxu.attrdesc
+
+from pysample_common.listener import Listener
+
+
+ITEM = "py.schema.statsItem"
+GRAPH = "py.schema.statsGraph"
+EVAL = "py.schema.stats"
+
+OUTPUTS = (
+    "linkCount",
+    "channelCount",
+    "intChannels",
+    "floatChannels",
+    "gradientChannels",
+    "otherChannels",
+    "animatedChannels",
+)
+
+
+class ItemStats(NamedTuple):
+    channels: int
+    integers: int
+    floats: int
+    gradients: int
+    others: int
+    animated: int
+
+
+def item_stats(item: lx.object.Item, chan: lx.object.ChannelRead = None) -> ItemStats:
+    """ Count the channels of item by type, and the animated ones if given a channel read, in a single pass. """
+    count = item.ChannelCount()
+    integers = floats = gradients = animated = 0
+    for index in range(count):
+        channel_type = item.ChannelType(index)
+        if channel_type == lx.symbol.iCHANTYPE_INTEGER:
+            integers += 1
+        elif channel_type == lx.symbol.iCHANTYPE_FLOAT:
+            floats += 1
+        elif channel_type == lx.symbol.iCHANTYPE_GRADIENT:
+            gradients += 1
+
+        if chan is not None and chan.IsAnimated(item, index):
+            animated += 1
+
+    return ItemStats(count, integers, floats, gradients, count - integers - floats - gradients, animated)
+
+
+class IdleRefresh(lxifc.Visitor):
+    """ Visitor run by the platform service once the user is idle, computing the statistics of the dirty items. """
+    def __init__(self, cache: "StatsCache"):
+        self.cache = cache
+
+    def vis_Evaluate(self):
+        self.cache.refresh_dirty()
+
+
+class StatsCache(Listener, lxifc.SceneItemListener):
+    """ Statistics per linked item ident, computed from scene events rather than during evaluation. Each change of the
+    statistics bumps the stamp of the item, which is what the modifiers compare to tell if they have to evaluate
+    again. """
+    def __init__(self):
+        self.entries = {}  # type: Dict[str, ItemStats]
+        self.stamps = {}  # item ident -> number of times its statistics changed
+        self.dirty = {}  # type: Dict[str, lx.object.Item]  # items to compute again once the user is idle
+        self.idle_visitor = IdleRefresh(self)
+        self.idle_pending = False
+        Listener.__init__(self)
+
+    def stamp(self, ident: str) -> int:
+        return self.stamps.get(ident, 0)
+
+    def get(self, item: lx.object.Item) -> ItemStats:
+        """ Cached statistics for item, an item linked before the cache heard about it is computed here once. """
+        stats = self.entries.get(item.Ident())
+        if stats is None:
+            stats = self.compute(item)
+        return stats
+
+    def compute(self, item: lx.object.Item) -> ItemStats:
+        """ Compute and store the statistics for item, reading the action for which channels are animated. """
+        stats = item_stats(item, item.Context().Channels(lx.symbol.s_ACTIONLAYER_ANIM, 0.0))
+        self.entries[item.Ident()] = stats
+        return stats
+
+    def mark(self, item):
+        """ Mark item to be computed again once the user is idle, if it is linked to a stats item. """
+        item = lx.object.Item(item)
+        ident = item.Ident()
+        if ident not in self.entries:
+            return
+
+        self.dirty[ident] = item
+        if not self.idle_pending:
+            self.idle_pending = True
+            lx.service.Platform().DoWhenUserIsIdle(self.idle_visitor, lx.symbol.fUSERIDLE_CMD_STACK_EMPTY)
+
+    def refresh_dirty(self):
+        """ Compute the dirty items again, invalidating the modifiers only if any of their statistics changed. """
+        self.idle_pending = False
+        dirty, self.dirty = self.dirty, {}
+        for ident, item in dirty.items():
+            previous = self.entries.get(ident)
+            if previous is None:  # unlinked or removed since it was marked
+                continue
+
+            if self.compute(item) != previous:
+                self.stamps[ident] = self.stamps.get(ident, 0) + 1
+                item.Context().EvalModInvalidate(EVAL)
+
+    def forget(self, ident: str):
+        self.entries.pop(ident, None)
+        self.stamps.pop(ident, None)
+        self.dirty.pop(ident, None)
+
+    def sil_LinkAdd(self, graph, itemFrom, itemTo):
+        # the link itself invalidates the modifier, as it depends on the graph
+        if lx.object.SceneGraph(graph).Name() == GRAPH:
+            self.compute(lx.object.Item(itemFrom))
+
+    def sil_LinkRemBefore(self, graph, itemFrom, itemTo):
+        # stop tracking the item when the link going away is the last one it has to a stats item
+        if lx.object.SceneGraph(graph).Name() == GRAPH:
+            item = lx.object.Item(itemFrom)
+            if lx.object.ItemGraph(graph).FwdCount(item) <= 1:
+                self.forget(item.Ident())
+
+    def sil_ItemAddChannel(self, item):
+        self.mark(item)
+
+    def sil_ItemPackage(self, item):
+        self.mark(item)
+
+    def sil_ChannelValue(self, action, item, index):
+        # keys being set or removed show up as value changes, which is what decides animated channels
+        self.mark(item)
+
+    def sil_ItemRemove(self, item):
+        self.forget(lx.object.Item(item).Ident())
+
+    def sil_SceneClear(self, scene):
+        self.entries.clear()
+        self.stamps.clear()
+        self.dirty.clear()
+
+
+stats_cache = StatsCache()
+
+
+class Package(lxu.meta.Package):
+    def synth_name(self) -> str:
+        return "Link Statistics"
+
+
+class Channels(lxu.meta.Channels):
+    def init_chan(self, desc: lxu.attrdesc.AttributeDesc):
+        for name in OUTPUTS:
+            desc.add(name, lx.symbol.sTYPE_INTEGER)
+            desc.default_val(0)
+
+
+class Eval(lxu.meta.EvalModifier):
+    def __init__(self):
+        self.item = lx.object.Item()
+        self.graph = lx.object.ItemGraph()
+        self.linked = ()  # (ident, stats stamp) of the items linked at the last evaluation
+        self.output_indices = []
+
+    def bind(self, item, ident):
+        self.item.set(item)
+        self.graph.set(self.item.Context().GraphLookup(GRAPH))
+        self.output_indices = [self.mod_add_chan(item, name, lx.symbol.fECHAN_WRITE) for name in OUTPUTS]
+
+    def links(self) -> List[lx.object.Item]:
+        if not (self.item.test() and self.graph.test()):
+            return []
+
+        count = self.graph.RevCount(self.item)
+        items = (lx.object.Item(self.graph.RevByIndex(self.item, index)) for index in range(count))
+        return [item for item in items if item.test()]
+
+    def linked_stamps(self, links: List[lx.object.Item]) -> Tuple[Tuple[str, int], ...]:
+        return tuple((item.Ident(), stats_cache.stamp(item.Ident())) for item in links)
+
+    def change_test(self) -> bool:
+        """ True if the set of links changed, or any linked item changed, since the last evaluation. """
+        return self.linked_stamps(self.links()) != self.linked
+
+    def eval(self):
+        links = self.links()
+        self.linked = self.linked_stamps(links)
+
+        totals = [0] * len(ItemStats._fields)
+        for stats in (stats_cache.get(item) for item in links):
+            totals = [total + value for total, value in zip(totals, stats)]
+
+        for index, value in zip(self.output_indices, [len(links)] + totals):
+            self.mod_cust_write(index).SetInt(value)
+
+
+channels_meta = lxu.meta.Meta_Channels(Channels)
+package_meta = lxu.meta.Meta_Package(ITEM, Package)
+schematic_meta = lxu.meta.Meta_SchematicConnection(GRAPH)
+eval_meta = lxu.meta.Meta_EvalModifier(EVAL, Eval)
+
+package_meta.set_supertype(lx.symbol.sITYPE_LOCATOR)
+package_meta.add_tag(lx.symbol.sPKG_GRAPHS, GRAPH)
+
+schematic_meta.set_itemtype(ITEM)
+schematic_meta.set_graph(GRAPH)
+
+eval_meta.add_dependent_graph(GRAPH)
+
+lxu.meta.MetaRoot(channels_meta, package_meta, schematic_meta, eval_meta)
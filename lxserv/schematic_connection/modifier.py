@@ -28,35 +28,37 @@ class Channels(lxu.meta.Channels):
 class Eval(lxu.meta.EvalModifier):
     def __init__(self):
         self.item = lx.object.Item()
-        self.cached_name = ""
+        self.graph = lx.object.ItemGraph()
+        self.cached_name = ""  # ident of the item linked at the last evaluation, empty if there was none
         self.itemNameChannelID = 0
 
     def bind(self, item, ident):
         self.item.set(item)
-        self.mod_add_chan(item, "channelCount", lx.symbol.fECHAN_WRITE)
+
+        # The graph is the same for as long as the modifier lives, so look it up once here rather than on every test
+        self.graph.set(self.item.Context().GraphLookup(GRAPH))
+        self.itemNameChannelID = self.mod_add_chan(item, "channelCount", lx.symbol.fECHAN_WRITE)
 
     def current_link(self) -> lx.object.Item:
-        graph = lx.object.ItemGraph()
-
-        if self.item.test():
-            scene = self.item.Context()
-            scene_graph = scene.GraphLookup(GRAPH)
-            graph.set(scene_graph)
-            if graph.RevCount(self.item):
-                linked_item = lx.object.Item(graph.RevByIndex(self.item, 0))
-                if linked_item.test():
-                    return linked_item
-
-    def change_test(self):
+        if self.item.test() and self.graph.test() and self.graph.RevCount(self.item):
+            linked_item = lx.object.Item(self.graph.RevByIndex(self.item, 0))
+            if linked_item.test():
+                return linked_item
+
+    def current_ident(self) -> str:
         item = self.current_link()
-        if item:
-            return item.Ident() == self.cached_name
+        return item.Ident() if item else ""
+
+    def change_test(self) -> bool:
+        """ True if the link changed since the last evaluation, in which case the modifier is allocated again. """
+        return self.current_ident() != self.cached_name
 
     def eval(self):
         channel_count = 0
         item = self.current_link()
         if item:
             channel_count = item.ChannelCount()
+        self.cached_name = item.Ident() if item else ""
 
         value = self.mod_cust_write(self.itemNameChannelID)
         value.SetInt(channel_count)